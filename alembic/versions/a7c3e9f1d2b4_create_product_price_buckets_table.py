@@ -0,0 +1,52 @@
+"""create product_price_buckets facet table and price indexes
+
+Revision ID: a7c3e9f1d2b4
+Revises: f3a9d2b7c6e1
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e9f1d2b4"
+down_revision: Union[str, None] = "f3a9d2b7c6e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# keep in sync with app/utils/facets.py PRICE_BUCKET_BOUNDS
+PRICE_BUCKET_BOUNDS = (10, 25, 50, 100, 250, 500, 1000)
+
+
+def upgrade() -> None:
+    op.create_index("ix_products_price_id", "products", ["price", "id"])
+    op.create_index("ix_products_category_price", "products", ["category", "price"])
+
+    op.create_table(
+        "product_price_buckets",
+        sa.Column("category", sa.String(length=120), nullable=False),
+        sa.Column("bucket", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("product_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("category", "bucket"),
+    )
+    bucket = "CASE {} ELSE {} END".format(
+        " ".join(f"WHEN price < {bound} THEN {index}" for index, bound in enumerate(PRICE_BUCKET_BOUNDS)),
+        len(PRICE_BUCKET_BOUNDS),
+    )
+    op.execute(
+        f"""
+        INSERT INTO product_price_buckets (category, bucket, product_count)
+        SELECT COALESCE(category, ''), {bucket}, COUNT(*)
+        FROM products
+        GROUP BY COALESCE(category, ''), {bucket}
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("product_price_buckets")
+    op.drop_index("ix_products_category_price", table_name="products")
+    op.drop_index("ix_products_price_id", table_name="products")
@@ -0,0 +1,40 @@
+"""add product_tombstones and updated_at index for delta sync
+
+Revision ID: b5e8d1c4f7a2
+Revises: a7c3e9f1d2b4
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e8d1c4f7a2"
+down_revision: Union[str, None] = "a7c3e9f1d2b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # updated_at is now set on insert too; never-updated rows start at created_at
+    op.execute("UPDATE products SET updated_at = created_at WHERE updated_at IS NULL")
+    op.create_index("ix_products_updated_at_id", "products", ["updated_at", "id"])
+
+    op.create_table(
+        "product_tombstones",
+        sa.Column("product_id", sa.String(length=36), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("product_id"),
+    )
+    op.create_index(
+        "ix_product_tombstones_deleted_at_id", "product_tombstones", ["deleted_at", "product_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_product_tombstones_deleted_at_id", table_name="product_tombstones")
+    op.drop_table("product_tombstones")
+    op.drop_index("ix_products_updated_at_id", table_name="products")
@@ -0,0 +1,55 @@
+"""merge duplicate cart lines and add unique (cart_id, product_id)
+
+Revision ID: c2d6f8a3e9b1
+Revises: b5e8d1c4f7a2
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c2d6f8a3e9b1"
+down_revision: Union[str, None] = "b5e8d1c4f7a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    cart_items = sa.table(
+        "cart_items",
+        sa.column("id", sa.String),
+        sa.column("cart_id", sa.String),
+        sa.column("product_id", sa.String),
+        sa.column("quantity", sa.Integer),
+    )
+
+    # add_item used to insert a new line every time; fold duplicates into one line
+    duplicates = conn.execute(
+        sa.select(cart_items.c.cart_id, cart_items.c.product_id)
+        .group_by(cart_items.c.cart_id, cart_items.c.product_id)
+        .having(sa.func.count() > 1)
+    ).all()
+    for cart_id, product_id in duplicates:
+        lines = conn.execute(
+            sa.select(cart_items.c.id, cart_items.c.quantity)
+            .where(cart_items.c.cart_id == cart_id, cart_items.c.product_id == product_id)
+            .order_by(cart_items.c.id)
+        ).all()
+        keep_id = lines[0].id
+        conn.execute(
+            cart_items.update()
+            .where(cart_items.c.id == keep_id)
+            .values(quantity=sum(line.quantity for line in lines))
+        )
+        conn.execute(cart_items.delete().where(cart_items.c.id.in_([line.id for line in lines[1:]])))
+
+    op.create_index("uq_cart_items_cart_product", "cart_items", ["cart_id", "product_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("uq_cart_items_cart_product", table_name="cart_items")
@@ -0,0 +1,79 @@
+"""add full-text search index for products
+
+Revision ID: c4d8e2f1a9b3
+Revises: a1f2c3d4e5f6
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d8e2f1a9b3"
+down_revision: Union[str, None] = "a1f2c3d4e5f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "mysql":
+        op.create_index(
+            "ft_products_search",
+            "products",
+            ["name", "description", "category"],
+            mysql_prefix="FULLTEXT",
+        )
+    elif dialect == "sqlite":
+        # external-content FTS5 table, synced by triggers on products
+        op.execute(
+            """
+            CREATE VIRTUAL TABLE products_fts USING fts5(
+                name, description, category,
+                content='products', content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER products_fts_ai AFTER INSERT ON products BEGIN
+                INSERT INTO products_fts(rowid, name, description, category)
+                VALUES (new.rowid, new.name, new.description, new.category);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER products_fts_ad AFTER DELETE ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, name, description, category)
+                VALUES ('delete', old.rowid, old.name, old.description, old.category);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER products_fts_au AFTER UPDATE ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, name, description, category)
+                VALUES ('delete', old.rowid, old.name, old.description, old.category);
+                INSERT INTO products_fts(rowid, name, description, category)
+                VALUES (new.rowid, new.name, new.description, new.category);
+            END
+            """
+        )
+        op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "mysql":
+        op.drop_index("ft_products_search", table_name="products")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS products_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ai")
+        op.execute("DROP TABLE IF EXISTS products_fts")
@@ -0,0 +1,34 @@
+"""add carts.last_activity_at for the idle guest cart sweeper
+
+Revision ID: d8b3f5a1c7e4
+Revises: c2d6f8a3e9b1
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d8b3f5a1c7e4"
+down_revision: Union[str, None] = "c2d6f8a3e9b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("carts") as batch_op:
+        batch_op.add_column(sa.Column("last_activity_at", sa.DateTime(), nullable=True))
+    # existing carts count as last active when they were created
+    op.execute("UPDATE carts SET last_activity_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+    with op.batch_alter_table("carts") as batch_op:
+        batch_op.alter_column("last_activity_at", existing_type=sa.DateTime(), nullable=False)
+    op.create_index("ix_carts_user_last_activity", "carts", ["user_id", "last_activity_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_carts_user_last_activity", table_name="carts")
+    with op.batch_alter_table("carts") as batch_op:
+        batch_op.drop_column("last_activity_at")
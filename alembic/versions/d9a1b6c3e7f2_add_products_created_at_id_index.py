@@ -0,0 +1,25 @@
+"""add (created_at, id) index to products for keyset pagination
+
+Revision ID: d9a1b6c3e7f2
+Revises: c4d8e2f1a9b3
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d9a1b6c3e7f2"
+down_revision: Union[str, None] = "c4d8e2f1a9b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_products_created_at_id", "products", ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_created_at_id", table_name="products")
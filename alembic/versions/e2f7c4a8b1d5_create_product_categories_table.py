@@ -0,0 +1,40 @@
+"""create product_categories summary table
+
+Revision ID: e2f7c4a8b1d5
+Revises: d9a1b6c3e7f2
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2f7c4a8b1d5"
+down_revision: Union[str, None] = "d9a1b6c3e7f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "product_categories",
+        sa.Column("name", sa.String(length=120), nullable=False),
+        sa.Column("product_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.execute(
+        """
+        INSERT INTO product_categories (name, product_count)
+        SELECT category, COUNT(*)
+        FROM products
+        WHERE category IS NOT NULL AND category != ''
+        GROUP BY category
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("product_categories")
@@ -0,0 +1,36 @@
+"""create product_images table for content-addressed uploads
+
+Revision ID: f3a9d2b7c6e1
+Revises: e2f7c4a8b1d5
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a9d2b7c6e1"
+down_revision: Union[str, None] = "e2f7c4a8b1d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "product_images",
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("path", sa.String(length=255), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("sha256"),
+    )
+    op.create_index(op.f("ix_product_images_last_seen_at"), "product_images", ["last_seen_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_product_images_last_seen_at"), table_name="product_images")
+    op.drop_table("product_images")
@@ -1,4 +1,4 @@
-from app.models.product import Product
+from app.models.product import Product, ProductCategory, ProductImage, ProductPriceBucket, ProductTombstone
 from app.models.user import User
 from app.models.cart import Cart, CartItem
 from app.models.order import Order, OrderItem
@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Integer
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.utils.database import Base
@@ -8,11 +8,17 @@ from app.utils.database import Base
 
 class Cart(Base):
     __tablename__ = "carts"
+    __table_args__ = (
+        # idle guest cart sweep: WHERE user_id IS NULL AND last_activity_at < cutoff
+        Index("ix_carts_user_last_activity", "user_id", "last_activity_at"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
     user_id = Column(String(225), ForeignKey("users.id"), nullable=True, index=True)
     session_token = Column(String(225), nullable=True, unique=True, index=True, default=lambda: str(uuid.uuid4()))
     created_at = Column(DateTime(timezone=True), server_default=func.now(), default=datetime.utcnow)
+    # bumped whenever the cart's lines change
+    last_activity_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
     user = relationship("User", back_populates="carts")
     items = relationship("CartItem", back_populates="cart", cascade="all, delete-orphan")
@@ -23,6 +29,10 @@ class Cart(Base):
 
 class CartItem(Base):
     __tablename__ = "cart_items"
+    __table_args__ = (
+        # one line per product: add_item upserts on it
+        Index("uq_cart_items_cart_product", "cart_id", "product_id", unique=True),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
     cart_id = Column(String(36), ForeignKey("carts.id"), nullable=False, index=True)
@@ -1,12 +1,21 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, Text, DECIMAL, DateTime
+from sqlalchemy import Column, String, Text, DECIMAL, DateTime, Index, Integer, BigInteger
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.utils.database import Base
 
 class Product(Base):
     __tablename__  = "products"
+    __table_args__ = (
+        # keyset pagination: ORDER BY created_at DESC, id DESC
+        Index("ix_products_created_at_id", "created_at", "id"),
+        # price range filters and price sorts, overall and within a category
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_category_price", "category", "price"),
+        # delta sync: WHERE (updated_at, id) > watermark ORDER BY updated_at, id
+        Index("ix_products_updated_at_id", "updated_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
     name = Column(String(225), nullable=False, index=True)
@@ -15,9 +24,64 @@ class Product(Base):
     price = Column(DECIMAL(12, 2), nullable=False)
     image_url = Column(String(255), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), default=datetime.utcnow)
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # set on insert as well, so it doubles as the change watermark for delta sync
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
     
     order_items = relationship("OrderItem", back_populates="product")
     
     def __repr__(self):
         return f"<Product id={self.id} name={self.name} price={self.price}>"
+
+
+class ProductCategory(Base):
+    """Category summary maintained on product writes (see app/utils/catalog.py)."""
+
+    __tablename__ = "product_categories"
+
+    name = Column(String(120), primary_key=True)
+    product_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ProductCategory name={self.name} product_count={self.product_count}>"
+
+
+class ProductPriceBucket(Base):
+    """Product counts per (category, price bucket), maintained on product writes (see app/utils/facets.py)."""
+
+    __tablename__ = "product_price_buckets"
+
+    # "" for products without a category
+    category = Column(String(120), primary_key=True)
+    bucket = Column(Integer, primary_key=True, autoincrement=False)
+    product_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ProductPriceBucket category={self.category} bucket={self.bucket} product_count={self.product_count}>"
+
+
+class ProductTombstone(Base):
+    """Deleted product ids, kept for delta sync (see app/utils/product_changes.py)."""
+
+    __tablename__ = "product_tombstones"
+    __table_args__ = (Index("ix_product_tombstones_deleted_at_id", "deleted_at", "product_id"),)
+
+    product_id = Column(String(36), primary_key=True)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ProductTombstone product_id={self.product_id} deleted_at={self.deleted_at}>"
+
+
+class ProductImage(Base):
+    """Content-addressed image blob under uploads/products, with a product reference count."""
+
+    __tablename__ = "product_images"
+
+    sha256 = Column(String(64), primary_key=True)
+    path = Column(String(255), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    last_seen_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<ProductImage sha256={self.sha256} ref_count={self.ref_count}>"
@@ -1,18 +1,26 @@
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, File, Request, UploadFile, status
 from fastapi import Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_, func
 from typing import List
 from datetime import date, datetime, time, timedelta
 
 from app.utils.database import SessionLocal
-from app.models import Order as OrderModel, OrderItem as OrderItemModel, Product as ProductModel, User as UserModel
+from app.models import Order as OrderModel, OrderItem as OrderItemModel, ProductCategory as ProductCategoryModel, User as UserModel
 from app.models.order import OrderStatus
 from app.schemas.order import Order as OrderSchema, OrderStatusUpdate
 from app.schemas.user import User as UserSchema, AdminUserUpdate
 from app.schemas.response import SuccessResponse, ErrorResponse
 from app.utils.response import success_response, error_response
 from app.utils.auth import require_admin
+from app.utils.cache import bump_version, cache_stats
+from app.utils.cart_sweeper import cart_sweeper
+from app.utils.images import collect_orphan_images
+from app.utils.pagination import count_total
+from app.utils.product_export import iter_product_export
+from app.utils.product_import import ImportAborted, import_products
+from app.utils.static import static_stats
 
 
 API_URL = "/admin"
@@ -65,6 +73,7 @@ def _apply_order_status(
 
     order.status = new_status
     db.commit()
+    bump_version("orders")
     db.refresh(order)
     order = _load_order(db, order_id)
 
@@ -86,6 +95,9 @@ def list_customers(
     per_page: int = Query(10, ge=1, le=100),
     search: str | None = Query(None, description="Search by name, email, or phone"),
     status_value: str | None = Query(None, description="Filter by active/inactive status"),
+    estimate_total: bool = Query(
+        False, description="Return an estimated total when the exact count would be large"
+    ),
     db: Session = Depends(get_db),
     current_admin: UserModel = Depends(require_admin),
 ):
@@ -105,7 +117,12 @@ def list_customers(
         if status_value in {"active", "inactive"}:
             query = query.filter(UserModel.is_active == (status_value == "active"))
 
-        total = query.count()
+        total, total_is_estimate = count_total(
+            query,
+            "users",
+            {"role": "customer", "search": search, "status_value": status_value},
+            estimate_total,
+        )
         total_pages = max((total + per_page - 1) // per_page, 1) if total else 0
         offset = (page - 1) * per_page
 
@@ -115,6 +132,7 @@ def list_customers(
             .limit(per_page)
             .all()
         )
+        has_next = page < total_pages or (total_is_estimate and len(customers) == per_page)
         return success_response(
             data=[_serialize_user(user) for user in customers],
             message="Customers fetched successfully",
@@ -124,8 +142,9 @@ def list_customers(
                     "page": page,
                     "per_page": per_page,
                     "total": total,
+                    "total_is_estimate": total_is_estimate,
                     "total_pages": total_pages,
-                    "has_next": page < total_pages,
+                    "has_next": has_next,
                     "has_prev": page > 1,
                 },
                 "filters": {
@@ -143,6 +162,162 @@ def list_customers(
         )
 
 
+@router.get(
+    "/cache-stats",
+    response_model=SuccessResponse[List[dict]],
+    responses={500: {"model": ErrorResponse}},
+)
+def read_cache_stats(
+    request: Request,
+    current_admin: UserModel = Depends(require_admin),
+):
+    return success_response(
+        data=cache_stats(),
+        message="Cache stats fetched successfully",
+        metadata={"request_id": getattr(request.state, "request_id", None)},
+    )
+
+
+@router.get(
+    "/static-stats",
+    response_model=SuccessResponse[dict],
+    responses={500: {"model": ErrorResponse}},
+)
+def read_static_stats(
+    request: Request,
+    current_admin: UserModel = Depends(require_admin),
+):
+    # /uploads traffic of this worker process
+    return success_response(
+        data=static_stats(),
+        message="Static file stats fetched successfully",
+        metadata={"request_id": getattr(request.state, "request_id", None)},
+    )
+
+
+@router.post(
+    "/products/import",
+    response_model=SuccessResponse[dict],
+    responses={400: {"model": ErrorResponse}},
+)
+def import_product_catalog(
+    request: Request,
+    file: UploadFile = File(...),
+    fmt: str | None = Query(None, alias="format", pattern="^(csv|ndjson)$", description="Defaults to the file extension"),
+    db: Session = Depends(get_db),
+    current_admin: UserModel = Depends(require_admin),
+):
+    if not fmt:
+        filename = (file.filename or "").lower()
+        fmt = "ndjson" if filename.endswith((".ndjson", ".jsonl")) else "csv"
+
+    try:
+        report = import_products(db, file.file, fmt)
+    except ImportAborted as e:
+        # earlier chunks are committed: tell the admin how many, re-uploading would duplicate them
+        return error_response(
+            message=f"Import stopped after {e.report['imported']} rows were imported",
+            code=400,
+            details=str(e),
+            metadata={
+                "request_id": getattr(request.state, "request_id", None),
+                "imported": e.report["imported"],
+                "report": e.report,
+            },
+        )
+
+    return success_response(
+        data=report,
+        message="Products imported",
+        metadata={"request_id": getattr(request.state, "request_id", None)},
+    )
+
+
+@router.get(
+    "/products/export",
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+def export_product_catalog(
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    current_admin: UserModel = Depends(require_admin),
+):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        iter_product_export(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
+
+@router.post(
+    "/images/gc",
+    response_model=SuccessResponse[dict],
+    responses={500: {"model": ErrorResponse}},
+)
+def collect_product_images(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_admin: UserModel = Depends(require_admin),
+):
+    try:
+        result = collect_orphan_images(db)
+        return success_response(
+            data=result,
+            message="Unreferenced product images removed",
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+    except Exception as e:
+        return error_response(
+            message="Failed to collect product images",
+            code=500,
+            details=str(e),
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+
+
+@router.get(
+    "/carts/sweep",
+    response_model=SuccessResponse[dict],
+    responses={500: {"model": ErrorResponse}},
+)
+def read_cart_sweep_stats(
+    request: Request,
+    current_admin: UserModel = Depends(require_admin),
+):
+    # idle guest cart sweeps of this worker process
+    return success_response(
+        data=cart_sweeper.stats(),
+        message="Cart sweeper stats fetched successfully",
+        metadata={"request_id": getattr(request.state, "request_id", None)},
+    )
+
+
+@router.post(
+    "/carts/sweep",
+    response_model=SuccessResponse[dict],
+    responses={500: {"model": ErrorResponse}},
+)
+def sweep_guest_carts(
+    request: Request,
+    ttl_days: float | None = Query(None, gt=0, description="Defaults to GUEST_CART_TTL_DAYS"),
+    current_admin: UserModel = Depends(require_admin),
+):
+    try:
+        result = cart_sweeper.run_once(ttl_days=ttl_days)
+        return success_response(
+            data=result,
+            message="Idle guest carts removed",
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+    except Exception as e:
+        return error_response(
+            message="Failed to sweep guest carts",
+            code=500,
+            details=str(e),
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+
+
 @router.get(
     "/dashboard",
     response_model=SuccessResponse[dict],
@@ -260,11 +435,9 @@ def dashboard_summary(
         ]
 
         product_category_counts = (
-            db.query(ProductModel.category, func.count(ProductModel.id))
-            .filter(ProductModel.category.isnot(None))
-            .filter(ProductModel.category != "")
-            .group_by(ProductModel.category)
-            .order_by(func.count(ProductModel.id).desc())
+            db.query(ProductCategoryModel.name, ProductCategoryModel.product_count)
+            .filter(ProductCategoryModel.product_count > 0)
+            .order_by(ProductCategoryModel.product_count.desc())
             .limit(6)
             .all()
         )
@@ -464,6 +637,7 @@ def update_customer(
         customer.is_active = payload.is_active
 
     db.commit()
+    bump_version("users")
     db.refresh(customer)
 
     return success_response(
@@ -487,6 +661,9 @@ def list_orders(
     start_date: date | None = None,
     end_date: date | None = None,
     search: str | None = None,
+    estimate_total: bool = Query(
+        False, description="Return an estimated total when the exact count would be large"
+    ),
     db: Session = Depends(get_db),
     current_admin: UserModel = Depends(require_admin),
 ):
@@ -526,11 +703,23 @@ def list_orders(
         if end_date:
             query = query.filter(OrderModel.created_at <= datetime.combine(end_date, time.max))
 
-        total = query.count()
+        total, total_is_estimate = count_total(
+            query,
+            "orders",
+            {
+                "status_value": status_value,
+                "customer_id": customer_id,
+                "start_date": start_date,
+                "end_date": end_date,
+                "search": search,
+            },
+            estimate_total,
+        )
         total_pages = max((total + per_page - 1) // per_page, 1) if total else 0
         offset = (page - 1) * per_page
 
         orders = query.offset(offset).limit(per_page).all()
+        has_next = page < total_pages or (total_is_estimate and len(orders) == per_page)
         return success_response(
             data=[_serialize_order(order) for order in orders],
             message="Orders fetched successfully",
@@ -540,8 +729,9 @@ def list_orders(
                     "page": page,
                     "per_page": per_page,
                     "total": total,
+                    "total_is_estimate": total_is_estimate,
                     "total_pages": total_pages,
-                    "has_next": page < total_pages,
+                    "has_next": has_next,
                     "has_prev": page > 1,
                 },
                 "filters": {
@@ -9,6 +9,7 @@ from app.models import User as UserModel, OTP
 from app.models.user import UserRole
 from app.schemas import User, UserCreate, UserUpdate, ForgotPasswordRequest, ResetPasswordRequest, VerifyOTPRequest, LoginRequest
 from app.utils.auth import hash_password, verify_password, create_access_token, get_current_user
+from app.utils.cache import bump_version
 from app.schemas.response import SuccessResponse, ErrorResponse
 from app.utils.otp import generate_otp, send_otp_email
 from app.utils.response import success_response, error_response
@@ -56,6 +57,7 @@ def register(request: Request, user: UserCreate, db: Session = Depends(get_db)):
         )
         db.add(new_user)
         db.commit()
+        bump_version("users")
         db.refresh(new_user)
         
         html_body = build_welcome_email(new_user.name)
@@ -162,6 +164,7 @@ def update_me(
         current_user.password = hash_password(payload.password)
 
     db.commit()
+    bump_version("users")
     db.refresh(current_user)
 
     return success_response(
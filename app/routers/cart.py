@@ -15,9 +15,27 @@ from app.schemas.cart import (
     CartItem as CartItemSchema,
     CartItemCreate as CartItemCreateSchema,
     CartItemUpdate as CartItemUpdateSchema,
+    CartItemsPatch as CartItemsPatchSchema,
 )
 from app.schemas.response import SuccessResponse, ErrorResponse
 from app.utils.response import success_response, error_response
+from app.utils.carts import (
+    cart_changed,
+    cart_deleted,
+    cart_merged,
+    existing_cart_products,
+    find_cart_id,
+    get_cart_payload,
+    get_or_create_user_cart,
+    lock_user_carts,
+    merge_guest_cart,
+    note_cart_read,
+    remove_cart_items,
+    set_cart_item_quantities,
+    touch_cart,
+    upsert_cart_item,
+)
+from app.utils.catalog import get_product_payload
 
 API_URL = "/carts"
 router = APIRouter(prefix=API_URL, tags=["Carts"])
@@ -97,6 +115,7 @@ def read_cart_lookup(
     Lookup cart:
     - If authenticated: use current_user.id
       - If cart not exists -> create a new cart tied to the user and return it
+      - A guest cart from before login is folded in with POST /carts/merge
     - Else (guest): require session_id and return the cart for that session (404 if not found)
     """
     if not current_user and not session_id:
@@ -106,25 +125,26 @@ def read_cart_lookup(
             metadata={"request_id": getattr(request.state, "request_id", None)},
         )
 
-    query = db.query(CartModel).options(
-        joinedload(CartModel.items).joinedload(CartItemModel.product)
-    )
-
     cart = None
 
     if current_user:
-        cart = query.filter(CartModel.user_id == str(current_user.id)).first()
-        if not cart:
-            cart = CartModel(user_id=str(current_user.id), session_token=None)
-            db.add(cart)
-            db.commit()
-
-            db.refresh(cart)
-            cart = db.query(CartModel).options(
-                joinedload(CartModel.items).joinedload(CartItemModel.product)
-            ).filter(CartModel.id == cart.id).first()
+        try:
+            cart_id = get_or_create_user_cart(db, str(current_user.id))
+            cart = get_cart_payload(db, cart_id)
+            if not cart:  # cached id of a cart deleted by another worker
+                cart_deleted(cart_id, user_id=str(current_user.id))
+                cart = get_cart_payload(db, get_or_create_user_cart(db, str(current_user.id)))
+        except Exception as e:
+            db.rollback()
+            return error_response(
+                message="Failed to fetch cart",
+                code=500,
+                details=str(e),
+                metadata={"request_id": getattr(request.state, "request_id", None)},
+            )
     else:
-        cart = query.filter(CartModel.session_token == session_id).first()
+        cart_id = find_cart_id(db, session_token=session_id)
+        cart = get_cart_payload(db, cart_id) if cart_id else None
         if not cart:
             return error_response(
                 message="Cart not found",
@@ -132,12 +152,51 @@ def read_cart_lookup(
                 metadata={"request_id": getattr(request.state, "request_id", None)},
             )
 
+    note_cart_read(db, str(cart["id"]))
     return success_response(
         message="Cart fetched",
-        data=_to_cart_dict(cart),
+        data=cart,
         metadata={"request_id": getattr(request.state, "request_id", None)},
     )
 
+@router.post(
+    "/merge",
+    response_model=SuccessResponse[CartSchema],
+    responses={404: {"model": ErrorResponse}, 401: {"model": ErrorResponse}},
+)
+def merge_cart(
+    request: Request,
+    session_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Merge the guest cart of session_id into the current user's cart and delete the guest cart"""
+    try:
+        merged = merge_guest_cart(db, str(current_user.id), session_id)
+        if not merged:
+            return error_response(
+                message="Cart not found",
+                code=404,
+                metadata={"request_id": getattr(request.state, "request_id", None)},
+            )
+        db.commit()
+        cart_merged(merged[0], session_id, str(current_user.id), merged[1])
+
+        return success_response(
+            message="Cart merged",
+            data=get_cart_payload(db, merged[1]),
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+    except Exception as e:
+        db.rollback()
+        return error_response(
+            message="Failed to merge cart",
+            code=500,
+            details=str(e),
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+
+
 @router.post(
     "/",
     response_model=SuccessResponse[CartSchema],
@@ -151,6 +210,7 @@ def create_cart(
 ):
     """Create cart (only allowed for authenticated users)"""
     try:
+        lock_user_carts(db, str(current_user.id))
         existing_cart = db.query(CartModel).filter(
             CartModel.user_id == str(current_user.id)
         ).first()
@@ -190,19 +250,18 @@ def create_cart(
 )
 def read_cart(request: Request, cart_id: str, db: Session = Depends(get_db)):
     """Get cart detail by ID"""
-    cart = db.query(CartModel).options(
-        joinedload(CartModel.items).joinedload(CartItemModel.product)
-    ).filter(CartModel.id == cart_id).first()
+    cart = get_cart_payload(db, cart_id)
     if not cart:
         return error_response(
             message="Cart not found",
             code=404,
             metadata={"request_id": getattr(request.state, "request_id", None)},
         )
+    note_cart_read(db, cart_id)
 
     return success_response(
         message="Cart fetched",
-        data=_to_cart_dict(cart),
+        data=cart,
         metadata={"request_id": getattr(request.state, "request_id", None)},
     )
 
@@ -222,8 +281,10 @@ def delete_cart(request: Request, cart_id: str, db: Session = Depends(get_db)):
             metadata={"request_id": getattr(request.state, "request_id", None)},
         )
 
+    user_id, session_token = cart.user_id, cart.session_token
     db.delete(cart)
     db.commit()
+    cart_deleted(cart_id, user_id, session_token)
 
     return success_response(
         message="Cart deleted successfully",
@@ -241,29 +302,31 @@ def delete_cart(request: Request, cart_id: str, db: Session = Depends(get_db)):
     status_code=status.HTTP_201_CREATED,
 )
 def add_item(request: Request, cart_id: str, item: CartItemCreateSchema, db: Session = Depends(get_db)):
-    """Add item to cart"""
-    cart = db.query(CartModel).filter(CartModel.id == cart_id).first()
-    if not cart:
-        return error_response(message="Cart not found", code=404)
-
+    """Add item to cart (adds to the quantity when the product is already in the cart)"""
     if item.quantity <= 0:
         return error_response(message="Quantity must be > 0", code=400)
 
     try:
-        db_item = CartItemModel(
-            cart_id=cart_id,
-            product_id=str(item.product_id),
-            quantity=int(item.quantity),
-        )
-        db.add(db_item)
+        product_id = str(item.product_id)
+        line = upsert_cart_item(db, cart_id, product_id, int(item.quantity))
+        if line is None:
+            db.rollback()
+            cart_exists = db.query(CartModel.id).filter(CartModel.id == cart_id).first() is not None
+            return error_response(message="Product not found" if cart_exists else "Cart not found", code=404)
+        touch_cart(db, cart_id)
         db.commit()
-        # refresh and re-query to include product relation
-        db.refresh(db_item)
-        db_item = db.query(CartItemModel).options(joinedload(CartItemModel.product)).filter(CartItemModel.id == db_item.id).first()
+        cart_changed(cart_id)
 
+        line_id, quantity = line
         return success_response(
             message="Item added to cart",
-            data=_to_cart_item_dict(db_item),
+            data={
+                "id": line_id,
+                "cart_id": cart_id,
+                "product_id": product_id,
+                "quantity": quantity,
+                "product": get_product_payload(db, product_id),
+            },
             metadata={"request_id": getattr(request.state, "request_id", None)},
         )
     except Exception as e:
@@ -288,7 +351,9 @@ def update_item(request: Request, cart_id: str, item_id: str, item: CartItemUpda
             return error_response(message="Quantity must be > 0", code=400)
         db_item.quantity = int(item.quantity)
 
+    touch_cart(db, cart_id)
     db.commit()
+    cart_changed(cart_id)
     db.refresh(db_item)
     db_item = db.query(CartItemModel).options(joinedload(CartItemModel.product)).filter(CartItemModel.id == db_item.id).first()
 
@@ -313,7 +378,9 @@ def delete_item(request: Request, cart_id: str, item_id: str, db: Session = Depe
         return error_response(message="Cart item not found", code=404)
 
     db.delete(db_item)
+    touch_cart(db, cart_id)
     db.commit()
+    cart_changed(cart_id)
 
     return success_response(
         message="Item removed successfully",
@@ -321,6 +388,63 @@ def delete_item(request: Request, cart_id: str, item_id: str, db: Session = Depe
         metadata={"request_id": getattr(request.state, "request_id", None)},
     )
 
+@router.patch(
+    "/{cart_id}/items",
+    response_model=SuccessResponse[CartSchema],
+    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+)
+def patch_items(request: Request, cart_id: str, payload: CartItemsPatchSchema, db: Session = Depends(get_db)):
+    """
+    Apply several line changes at once and return the updated cart:
+    - {"op": "set", "product_id": ..., "quantity": n} -> change the line quantity
+    - {"op": "remove", "product_id": ...} -> remove the line
+    All operations succeed or none do.
+    """
+    metadata = {"request_id": getattr(request.state, "request_id", None)}
+
+    quantities = {}
+    removals = set()
+    for operation in payload.operations:
+        product_id = str(operation.product_id)
+        if product_id in quantities or product_id in removals:
+            return error_response(message=f"Product {product_id} appears more than once", code=400, metadata=metadata)
+        if operation.op == "set":
+            if operation.quantity is None or operation.quantity <= 0:
+                return error_response(message="Quantity must be > 0", code=400, metadata=metadata)
+            quantities[product_id] = int(operation.quantity)
+        else:
+            removals.add(product_id)
+
+    try:
+        cart = db.query(CartModel.id).filter(CartModel.id == cart_id).first()
+        if not cart:
+            return error_response(message="Cart not found", code=404, metadata=metadata)
+
+        missing = (set(quantities) | removals) - existing_cart_products(db, cart_id, set(quantities) | removals)
+        if missing:
+            return error_response(
+                message="Cart item not found",
+                code=404,
+                details=", ".join(sorted(missing)),
+                metadata=metadata,
+            )
+
+        set_cart_item_quantities(db, cart_id, quantities)
+        remove_cart_items(db, cart_id, removals)
+        touch_cart(db, cart_id)
+        db.commit()
+        cart_changed(cart_id)
+
+        return success_response(
+            message="Cart items updated",
+            data=get_cart_payload(db, cart_id),
+            metadata=metadata,
+        )
+    except Exception as e:
+        db.rollback()
+        return error_response(message="Failed to update cart items", code=500, details=str(e), metadata=metadata)
+
+
 @router.delete(
     "/{cart_id}/items",
     response_model=SuccessResponse[dict],
@@ -337,7 +461,9 @@ def delete_all_cart_items(cart_id: str, request: Request, db: Session = Depends(
 
     # Hapus semua items
     db.query(CartItemModel).filter(CartItemModel.cart_id == cart_id).delete()
+    touch_cart(db, cart_id)
     db.commit()
+    cart_changed(cart_id)
 
     return success_response(
         data={"deleted_cart_id": cart_id},
@@ -14,6 +14,8 @@ from app.utils.response import success_response, error_response
 from app.utils.email import send_email
 from app.utils.templates.checkout_email import build_checkout_email
 from app.utils.auth import get_current_user, require_customer
+from app.utils.cache import bump_version
+from app.utils.pagination import count_total
 
 
 API_URL = "/orders"
@@ -162,6 +164,7 @@ def create_order(
             db.add(db_item)
 
         db.commit()
+        bump_version("orders")
         db_order = _load_order(db, str(db_order.id), str(current_user.id))
         if not db_order:
             raise ValueError("Failed to reload created order")
@@ -205,6 +208,9 @@ def read_my_orders(
     kind: str = Query("active", pattern="^(active|history)$"),
     status_value: str | None = None,
     search: str | None = None,
+    estimate_total: bool = Query(
+        False, description="Return an estimated total when the exact count would be large"
+    ),
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(require_customer),
 ):
@@ -243,13 +249,24 @@ def read_my_orders(
                     OrderModel.phone.ilike(like_search),
                 )
             )
-        total = query.count()
+        total, total_is_estimate = count_total(
+            query,
+            "orders",
+            {
+                "user_id": str(current_user.id),
+                "kind": kind,
+                "status_value": status_value,
+                "search": search,
+            },
+            estimate_total,
+        )
         total_pages = max((total + per_page - 1) // per_page, 1) if total else 0
         orders = (
             query.offset(offset)
             .limit(per_page)
             .all()
         )
+        has_next = page < total_pages or (total_is_estimate and len(orders) == per_page)
         return success_response(
             data=[_serialize_order(order) for order in orders],
             message="My orders fetched successfully",
@@ -259,8 +276,9 @@ def read_my_orders(
                     "page": page,
                     "per_page": per_page,
                     "total": total,
+                    "total_is_estimate": total_is_estimate,
                     "total_pages": total_pages,
-                    "has_next": page < total_pages,
+                    "has_next": has_next,
                     "has_prev": page > 1,
                 },
             },
@@ -10,6 +10,7 @@ from app.models import Order as OrderModel, OrderItem as OrderItemModel, User as
 from app.models.order import OrderStatus, PaymentMethod
 from app.schemas.response import ErrorResponse, SuccessResponse
 from app.utils.auth import require_customer
+from app.utils.cache import bump_version
 from app.utils.database import SessionLocal
 from app.utils.response import error_response, success_response
 from app.utils.stripe_client import get_frontend_url, get_stripe_client
@@ -184,6 +185,7 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
         order.stripe_payment_intent_id = data_object.get("payment_intent") or order.stripe_payment_intent_id
         order.stripe_customer_id = data_object.get("customer") or order.stripe_customer_id
         db.commit()
+        bump_version("orders")
 
     if event_type in {"checkout.session.completed", "checkout.session.async_payment_succeeded"}:
         session_id = data_object.get("id")
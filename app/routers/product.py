@@ -1,25 +1,64 @@
 # app/routers/product.py
-import os
-import shutil
-from pathlib import Path
-from uuid import uuid4
-
 from fastapi import APIRouter, Depends, File, Request, UploadFile, status
+from sqlalchemy import and_, case, or_
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List
 from fastapi.encoders import jsonable_encoder
 from fastapi import Query
 
 from app.utils.database import SessionLocal
-from app.models import Product as ProductModel
-from app.schemas import Product, ProductCreate, ProductUpdate
+from app.models import Product as ProductModel, ProductImage as ProductImageModel
+from app.schemas import (
+    DirectUploadComplete,
+    DirectUploadRequest,
+    Product,
+    ProductBatchRequest,
+    ProductCreate,
+    ProductUpdate,
+)
 from app.schemas.response import SuccessResponse, ErrorResponse
-from app.utils.response import success_response, error_response
+from app.utils.response import (
+    error_response,
+    etag_matches,
+    make_etag,
+    not_modified_response,
+    success_response,
+    with_etag,
+)
+from app.utils.catalog import (
+    adjust_category_count,
+    get_cached_product,
+    get_product_entries,
+    get_product_payloads,
+    list_categories,
+    product_entries,
+    product_deleted,
+    product_list_cache,
+    product_saved,
+)
+from app.utils.facets import adjust_price_facet, facet_counts, query_facet_counts
+from app.utils.fuzzy import trigram_index
+from app.utils.suggestions import suggestion_index
+from app.utils.cache import get_version
+from app.utils.product_changes import SyncTokenExpired, product_changes, record_tombstone
+from app.utils.pagination import InvalidCursor, count_total, decode_cursor, encode_cursor
+from app.utils.search import apply_search
+from app.utils.image_variants import schedule_variants, variant_urls
+from app.utils.images import (
+    IMAGE_KEY_PREFIX,
+    adjust_image_refs,
+    blob_path,
+    image_extension,
+    image_public_url,
+    register_image_blob,
+    store_image_blob,
+)
+from app.utils.storage import UPLOAD_STAGING_ROOT, InvalidUploadToken, get_storage, verify_upload_token
+from app.utils.uploads import MAX_IMAGE_UPLOAD_BYTES, UploadTooLarge, stage_stream, stage_upload
 
 API_URL = "/products"
 router = APIRouter(prefix=API_URL, tags=["Products"])
-UPLOAD_DIR = Path(__file__).resolve().parents[2] / "uploads" / "products"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def get_db():
@@ -30,63 +69,258 @@ def get_db():
         db.close()
 
 
-from sqlalchemy import or_
+def _product_list_etag(entries, pagination: dict, filters: dict, facets: dict | None = None) -> str:
+    """List ETag from the cached per-product ETags, without re-serializing the page."""
+    return make_etag([etag for _, etag in entries], pagination, filters, facets)
+
+
+# sort option -> ORDER BY; price sorts use ix_products_price_id / ix_products_category_price
+PRODUCT_SORTS = {
+    "newest": (ProductModel.created_at.desc(), ProductModel.id.desc()),
+    "price_asc": (ProductModel.price.asc(), ProductModel.id.asc()),
+    "price_desc": (ProductModel.price.desc(), ProductModel.id.desc()),
+}
+
+
+def _has_search_match(db: Session, search: str) -> bool:
+    return apply_search(db.query(ProductModel.id), search, rank=False).first() is not None
+
+
+def _normalize_search(search: str | None) -> str | None:
+    # case and whitespace do not change matches, so they must not split the cache
+    return " ".join(search.lower().split()) or None if search else None
+
+
+def _product_list_response(
+    request: Request,
+    entries,
+    result: dict,
+):
+    pagination, filters, facets = result["pagination"], result["filters"], result["facets"]
+    etag = _product_list_etag(entries, pagination, filters, facets)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+
+    metadata = {
+        "request_id": getattr(request.state, "request_id", None),
+        "pagination": pagination,
+        "filters": filters,
+    }
+    if facets is not None:
+        metadata["facets"] = facets
+    if result["similarity"] is not None:
+        metadata["similarity"] = {
+            product_id: result["similarity"].get(product_id) for product_id in result["ids"]
+        }
+
+    return with_etag(
+        success_response(
+            data=[payload for payload, _ in entries],
+            message="Products fetched successfully",
+            metadata=metadata,
+        ),
+        etag,
+    )
+
+
+def _seek_products_by_cursor(query, cursor: str, per_page: int):
+    """Seek on (created_at, id) via ix_products_created_at_id; no OFFSET, no COUNT."""
+    position = decode_cursor(cursor)
+    if position:
+        created_at, last_id = position
+        query = query.filter(
+            or_(
+                ProductModel.created_at < created_at,
+                and_(ProductModel.created_at == created_at, ProductModel.id < last_id),
+            )
+        )
+
+    rows = query.order_by(*PRODUCT_SORTS["newest"]).limit(per_page + 1).all()
+    has_next = len(rows) > per_page
+    products = rows[:per_page]
+    next_cursor = (
+        encode_cursor(products[-1].created_at, products[-1].id) if has_next else None
+    )
+    pagination = {
+        "per_page": per_page,
+        "cursor": cursor or None,
+        "next_cursor": next_cursor,
+        "has_next": has_next,
+    }
+    return products, pagination
+
+
+def _load_product_list(
+    db: Session,
+    page: int,
+    per_page: int,
+    search: str | None,
+    category: str | None,
+    min_price: float | None,
+    max_price: float | None,
+    sort: str | None,
+    facets: bool,
+    fuzzy: bool,
+    cursor: str | None,
+    estimate_total: bool,
+) -> dict:
+    """
+    Run a product list query. Returns the page as product ids plus pagination,
+    filters, facets and fuzzy similarity: everything except the payloads, which
+    come from the product cache, so the result is cheap to cache.
+    """
+    query = db.query(ProductModel)
+
+    similarity = None
+    if search and fuzzy and not _has_search_match(db, search):
+        # no exact match: typo-tolerant candidates from the trigram index, best first
+        trigram_index.ensure_loaded(db)
+        similarity = dict(trigram_index.search(search))
+        query = query.filter(ProductModel.id.in_(list(similarity)))
+        if cursor is None and sort is None and similarity:
+            query = query.order_by(
+                case({product_id: rank for rank, product_id in enumerate(similarity)}, value=ProductModel.id)
+            )
+    elif search:
+        # full-text index match, ordered by relevance first (not in cursor mode or when sorting)
+        query = apply_search(query, search, rank=cursor is None and sort is None)
+
+    facet_data = None
+    if facets:
+        # each facet ignores its own filter, so count before category / price are applied
+        facet_data = (
+            query_facet_counts(query, category, min_price, max_price)
+            if search
+            else facet_counts(db, category, min_price, max_price)
+        )
+
+    if category:
+        query = query.filter(ProductModel.category == category)
+    if min_price is not None:
+        query = query.filter(ProductModel.price >= min_price)
+    if max_price is not None:
+        query = query.filter(ProductModel.price <= max_price)
+
+    filters = {
+        "search": search,
+        "category": category,
+        "min_price": min_price,
+        "max_price": max_price,
+        "sort": sort,
+        "search_mode": ("fuzzy" if similarity is not None else "exact") if search else None,
+    }
+
+    if cursor is not None:
+        products, pagination = _seek_products_by_cursor(query, cursor, per_page)
+    else:
+        if sort or not search:
+            query = query.order_by(*PRODUCT_SORTS[sort or "newest"])
+
+        total, total_is_estimate = count_total(
+            query,
+            "products",
+            {
+                "search": search,
+                "fuzzy": similarity is not None,
+                "category": category,
+                "min_price": min_price,
+                "max_price": max_price,
+            },
+            estimate_total,
+        )
+        offset = (page - 1) * per_page
+
+        products = query.offset(offset).limit(per_page).all()
+        total_pages = max((total + per_page - 1) // per_page, 1) if total else 0
+        has_next = page < total_pages or (total_is_estimate and len(products) == per_page)
+        pagination = {
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "total_is_estimate": total_is_estimate,
+            "total_pages": total_pages,
+            "has_next": has_next,
+            "has_prev": page > 1,
+        }
+
+    # warm the product cache with the rows already loaded
+    product_entries(products)
+    return {
+        "ids": [str(product.id) for product in products],
+        "pagination": pagination,
+        "filters": filters,
+        "facets": facet_data,
+        "similarity": similarity,
+    }
+
 
 # Get all products with optional search
 @router.get(
     "/",
     response_model=SuccessResponse[List[Product]],
-    responses={500: {"model": ErrorResponse}},
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
 )
 def read_products(
     request: Request,
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
-    search: str | None = Query(None, description="Search by name or description"),
+    search: str | None = Query(None, description="Full-text search by name, description or category"),
     category: str | None = Query(None, description="Filter by category"),
+    min_price: float | None = Query(None, ge=0, description="Minimum price (inclusive)"),
+    max_price: float | None = Query(None, ge=0, description="Maximum price (inclusive)"),
+    sort: str | None = Query(
+        None,
+        pattern="^(newest|price_asc|price_desc)$",
+        description="Defaults to relevance when searching, newest otherwise",
+    ),
+    facets: bool = Query(False, description="Include category and price bucket counts in metadata.facets"),
+    fuzzy: bool = Query(True, description="Fall back to typo-tolerant matching when the search has no exact match"),
+    cursor: str | None = Query(
+        None,
+        description="Keyset pagination cursor (send empty to start); replaces page and total count",
+    ),
+    estimate_total: bool = Query(
+        False, description="Return an estimated total when the exact count would be large"
+    ),
     db: Session = Depends(get_db),
 ):
     try:
-        query = db.query(ProductModel)
-
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    ProductModel.name.ilike(search_term),
-                    ProductModel.description.ilike(search_term),
-                    ProductModel.category.ilike(search_term),
-                )
+        if cursor is not None and sort not in (None, "newest"):
+            return error_response(
+                message="Invalid sort",
+                code=400,
+                details="Cursor pagination only supports sort=newest",
+                metadata={"request_id": getattr(request.state, "request_id", None)},
             )
 
-        if category:
-            query = query.filter(ProductModel.category == category)
-
-        query = query.order_by(ProductModel.created_at.desc())
-
-        total = query.count()
-        current_page = page
-        offset = (page - 1) * per_page
-
-        products = query.offset(offset).limit(per_page).all()
-        total_pages = max((total + per_page - 1) // per_page, 1) if total else 0
+        params = {
+            "page": page if cursor is None else 1,
+            "per_page": per_page,
+            "search": _normalize_search(search),
+            "category": category.strip() or None if category else None,
+            "min_price": min_price,
+            "max_price": max_price,
+            "sort": None if sort == "newest" and not search else sort,
+            "facets": facets,
+            "fuzzy": fuzzy,
+            "cursor": cursor,
+            "estimate_total": estimate_total,
+        }
+        # the products version in the key drops every cached list on a product write;
+        # identical concurrent misses run the query once
+        key = (get_version("products"), tuple(sorted(params.items())))
+        try:
+            result = product_list_cache.get_or_load(key, lambda: _load_product_list(db, **params))
+        except InvalidCursor as e:
+            return error_response(
+                message="Invalid cursor",
+                code=400,
+                details=str(e),
+                metadata={"request_id": getattr(request.state, "request_id", None)},
+            )
 
-        return success_response(
-            data=[Product.model_validate(p).model_dump() for p in products],
-            message="Products fetched successfully",
-            metadata={
-                "request_id": getattr(request.state, "request_id", None),
-                "pagination": {
-                    "page": current_page,
-                    "per_page": per_page,
-                    "total": total,
-                    "total_pages": total_pages,
-                    "has_next": current_page < total_pages,
-                    "has_prev": current_page > 1,
-                },
-                "filters": {"search": search, "category": category},
-            },
-        )
+        entries = get_product_entries(db, result["ids"])
+        return _product_list_response(request, entries, result)
     except Exception as e:
         return error_response(
             message="Failed to fetch products",
@@ -106,38 +340,132 @@ def product_categories(
     db: Session = Depends(get_db),
 ):
     try:
-        categories = (
-            db.query(ProductModel.category)
-            .filter(ProductModel.category.isnot(None))
-            .filter(ProductModel.category != "")
-            .distinct()
-            .order_by(ProductModel.category.asc())
-            .all()
+        # served from the product_categories summary, not a DISTINCT over products
+        names = [category.name for category in list_categories(db)]
+        etag = make_etag(names)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+
+        return with_etag(
+            success_response(
+                data=names,
+                message="Product categories fetched successfully",
+                metadata={"request_id": getattr(request.state, "request_id", None)},
+            ),
+            etag,
+        )
+    except Exception as e:
+        return error_response(
+            message="Failed to fetch product categories",
+            code=500,
+            details=str(e),
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+
+
+@router.get(
+    "/categories/summary",
+    response_model=SuccessResponse[List[dict]],
+    responses={500: {"model": ErrorResponse}},
+)
+def product_category_summary(
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    try:
+        summary = [
+            {"name": category.name, "product_count": category.product_count}
+            for category in list_categories(db)
+        ]
+        etag = make_etag(summary)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+
+        return with_etag(
+            success_response(
+                data=summary,
+                message="Product category summary fetched successfully",
+                metadata={"request_id": getattr(request.state, "request_id", None)},
+            ),
+            etag,
+        )
+    except Exception as e:
+        return error_response(
+            message="Failed to fetch product category summary",
+            code=500,
+            details=str(e),
+            metadata={"request_id": getattr(request.state, "request_id", None)},
         )
 
-        return success_response(
-            data=[category[0] for category in categories],
-            message="Product categories fetched successfully",
+
+# Delta sync: products changed / deleted since a token
+@router.get(
+    "/changes",
+    response_model=SuccessResponse[dict],
+    responses={400: {"model": ErrorResponse}, 410: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+)
+def read_product_changes(
+    request: Request,
+    since: str | None = Query(None, description="next_token of the previous sync; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    try:
+        changes = product_changes(db, since, limit)
+    except InvalidCursor as e:
+        return error_response(
+            message="Invalid sync token",
+            code=400,
+            details=str(e),
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+    except SyncTokenExpired as e:
+        return error_response(
+            message="Sync token expired",
+            code=410,
+            details=str(e),
             metadata={"request_id": getattr(request.state, "request_id", None)},
         )
     except Exception as e:
         return error_response(
-            message="Failed to fetch product categories",
+            message="Failed to fetch product changes",
             code=500,
             details=str(e),
             metadata={"request_id": getattr(request.state, "request_id", None)},
         )
 
+    return success_response(
+        data=changes,
+        message="Product changes fetched successfully",
+        metadata={"request_id": getattr(request.state, "request_id", None)},
+    )
+
+
+def _uploaded_image_data(request: Request, path: str, content_type: str, size: int, sha256: str, created: bool) -> dict:
+    public_url = image_public_url(path, str(request.base_url).rstrip("/"))
+    # derivatives are rendered off-process; a request that beats the job renders lazily
+    schedule_variants(sha256)
+    return {
+        "url": public_url,
+        "filename": path,
+        "content_type": content_type,
+        "size": size,
+        "sha256": sha256,
+        "deduplicated": not created,
+        "variants": variant_urls(public_url),
+    }
+
 
 @router.post(
     "/upload-image",
     response_model=SuccessResponse[dict],
-    responses={400: {"model": ErrorResponse}},
+    responses={400: {"model": ErrorResponse}, 413: {"model": ErrorResponse}},
     status_code=status.HTTP_201_CREATED,
 )
 async def upload_product_image(
     request: Request,
     file: UploadFile = File(...),
+    db: Session = Depends(get_db),
 ):
     try:
         content_type = file.content_type or ""
@@ -149,23 +477,136 @@ async def upload_product_image(
                 metadata={"request_id": getattr(request.state, "request_id", None)},
             )
 
-        _, ext = os.path.splitext(file.filename or "")
-        safe_ext = ext if ext else ".jpg"
-        filename = f"{uuid4().hex}{safe_ext}"
-        save_path = UPLOAD_DIR / filename
+        try:
+            staged = await stage_upload(file, UPLOAD_STAGING_ROOT)
+        except UploadTooLarge as e:
+            return error_response(
+                message="Image is too large",
+                code=413,
+                details=str(e),
+                metadata={"request_id": getattr(request.state, "request_id", None)},
+            )
+        # stored under its content hash; identical bytes are written only once
+        filename, created = await run_in_threadpool(
+            store_image_blob, db, staged, image_extension(content_type, file.filename), content_type
+        )
+
+        return success_response(
+            data=_uploaded_image_data(request, filename, content_type, staged.size, staged.sha256, created),
+            message="Image uploaded successfully",
+            code=201,
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+    except Exception as e:
+        return error_response(
+            message="Failed to upload image",
+            code=400,
+            details=str(e),
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
 
-        with save_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+
+# Direct upload, step 1: signed URL the client PUTs the image bytes to
+@router.post(
+    "/upload-url",
+    response_model=SuccessResponse[dict],
+    responses={400: {"model": ErrorResponse}, 413: {"model": ErrorResponse}},
+)
+def create_image_upload_url(request: Request, payload: DirectUploadRequest, db: Session = Depends(get_db)):
+    try:
+        if not payload.content_type.startswith("image/"):
+            return error_response(
+                message="Invalid image file",
+                code=400,
+                details="Only image files are allowed",
+                metadata={"request_id": getattr(request.state, "request_id", None)},
+            )
+        if payload.size > MAX_IMAGE_UPLOAD_BYTES:
+            return error_response(
+                message="Image is too large",
+                code=413,
+                details=f"File exceeds the {MAX_IMAGE_UPLOAD_BYTES} byte limit",
+                metadata={"request_id": getattr(request.state, "request_id", None)},
+            )
 
         request_base = str(request.base_url).rstrip("/")
-        public_url = f"{request_base}/uploads/products/{filename}"
+        storage = get_storage()
+        path = blob_path(payload.sha256, image_extension(payload.content_type, payload.filename))
+        existing = db.query(ProductImageModel).filter(ProductImageModel.sha256 == payload.sha256).first()
+        if existing and storage.head(IMAGE_KEY_PREFIX + existing.path) is not None:
+            # already stored: nothing to upload
+            path = register_image_blob(db, payload.sha256, existing.path, existing.size)
+            data = {"upload": None, **_uploaded_image_data(
+                request, path, payload.content_type, existing.size, payload.sha256, created=False
+            )}
+        else:
+            data = {
+                "upload": storage.presign_upload(
+                    IMAGE_KEY_PREFIX + path, payload.content_type, payload.size, payload.sha256, request_base
+                ),
+                "url": image_public_url(path, request_base),
+                "filename": path,
+                "sha256": payload.sha256,
+            }
 
         return success_response(
-            data={
-                "url": public_url,
-                "filename": filename,
-                "content_type": content_type,
-            },
+            data=data,
+            message="Upload URL created successfully",
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+    except Exception as e:
+        return error_response(
+            message="Failed to create upload URL",
+            code=400,
+            details=str(e),
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+
+
+# Direct upload target for the local storage backend (object stores take the PUT themselves)
+@router.put(
+    "/direct-upload/{token}",
+    response_model=SuccessResponse[dict],
+    responses={400: {"model": ErrorResponse}, 403: {"model": ErrorResponse}, 413: {"model": ErrorResponse}},
+    status_code=status.HTTP_201_CREATED,
+)
+async def direct_upload_image(request: Request, token: str, db: Session = Depends(get_db)):
+    try:
+        try:
+            claims = verify_upload_token(token)
+            staged = await stage_stream(request.stream(), UPLOAD_STAGING_ROOT, max_bytes=claims["size"])
+        except InvalidUploadToken as e:
+            return error_response(
+                message="Invalid upload URL",
+                code=403,
+                details=str(e),
+                metadata={"request_id": getattr(request.state, "request_id", None)},
+            )
+        except UploadTooLarge as e:
+            return error_response(
+                message="Image is too large",
+                code=413,
+                details=str(e),
+                metadata={"request_id": getattr(request.state, "request_id", None)},
+            )
+
+        if staged.sha256 != claims["sha256"] or staged.size != claims["size"]:
+            staged.path.unlink(missing_ok=True)
+            return error_response(
+                message="Upload does not match the signed URL",
+                code=400,
+                details="Size or sha256 of the uploaded bytes differs from the requested upload",
+                metadata={"request_id": getattr(request.state, "request_id", None)},
+            )
+
+        path = claims["key"][len(IMAGE_KEY_PREFIX):]
+        filename, created = await run_in_threadpool(
+            store_image_blob, db, staged, path[path.rindex("."):], claims["content_type"]
+        )
+        return success_response(
+            data=_uploaded_image_data(
+                request, filename, claims["content_type"], staged.size, staged.sha256, created
+            ),
             message="Image uploaded successfully",
             code=201,
             metadata={"request_id": getattr(request.state, "request_id", None)},
@@ -178,6 +619,51 @@ async def upload_product_image(
             metadata={"request_id": getattr(request.state, "request_id", None)},
         )
 
+
+# Direct upload, step 2: register the object once the client's PUT has succeeded
+@router.post(
+    "/upload-complete",
+    response_model=SuccessResponse[dict],
+    responses={400: {"model": ErrorResponse}},
+)
+def complete_image_upload(request: Request, payload: DirectUploadComplete, db: Session = Depends(get_db)):
+    try:
+        path = blob_path(payload.sha256, image_extension(payload.content_type, payload.filename))
+        storage = get_storage()
+        stored = storage.head(IMAGE_KEY_PREFIX + path)
+        # local files were verified on PUT, object stores must confirm the checksum
+        if (
+            stored is not None
+            and not storage.serves_locally
+            and not storage.verify_sha256(IMAGE_KEY_PREFIX + path, payload.sha256)
+        ):
+            storage.delete(IMAGE_KEY_PREFIX + path)
+            stored = None
+        if stored is None:
+            return error_response(
+                message="Upload not found",
+                code=400,
+                details="No verified object was uploaded for this sha256",
+                metadata={"request_id": getattr(request.state, "request_id", None)},
+            )
+
+        existing = db.query(ProductImageModel).filter(ProductImageModel.sha256 == payload.sha256).first()
+        filename = register_image_blob(db, payload.sha256, path, stored.size)
+        return success_response(
+            data=_uploaded_image_data(
+                request, filename, payload.content_type, stored.size, payload.sha256, created=existing is None
+            ),
+            message="Image upload completed successfully",
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+    except Exception as e:
+        return error_response(
+            message="Failed to complete image upload",
+            code=400,
+            details=str(e),
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+
 # Get product suggestions (autocomplete)
 @router.get(
     "/suggestions",
@@ -191,15 +677,9 @@ def product_suggestions(
     db: Session = Depends(get_db),
 ):
     try:
-        suggestions = (
-            db.query(ProductModel.name)
-            .filter(ProductModel.name.ilike(f"%{q}%"))
-            .order_by(ProductModel.name.asc())
-            .limit(limit)
-            .all()
-        )
-
-        result = [s[0] for s in suggestions]
+        # prefix match on name words, served from memory
+        suggestion_index.ensure_loaded(db)
+        result = suggestion_index.suggest(q, limit)
 
         return success_response(
             data=result,
@@ -235,8 +715,12 @@ def create_product(request: Request, product: ProductCreate, db: Session = Depen
             image_url=str(product.image_url),
         )
         db.add(db_product)
+        adjust_category_count(db, db_product.category, 1)
+        adjust_price_facet(db, db_product.category, db_product.price, 1)
+        adjust_image_refs(db, db_product.image_url, 1)
         db.commit()
         db.refresh(db_product)
+        product_saved(db_product)
 
         return success_response(
             data=Product.model_validate(db_product).model_dump(),
@@ -253,6 +737,38 @@ def create_product(request: Request, product: ProductCreate, db: Session = Depen
         )
 
 
+# Get many products by id (cart / order line items)
+@router.post(
+    "/batch",
+    response_model=SuccessResponse[List[Product]],
+    responses={500: {"model": ErrorResponse}},
+)
+def read_products_batch(
+    request: Request,
+    payload: ProductBatchRequest,
+    db: Session = Depends(get_db),
+):
+    try:
+        found = get_product_payloads(db, payload.ids)
+        ordered_ids = list(dict.fromkeys(payload.ids))
+
+        return success_response(
+            data=[found[product_id] for product_id in ordered_ids if product_id in found],
+            message="Products fetched successfully",
+            metadata={
+                "request_id": getattr(request.state, "request_id", None),
+                "missing_ids": [product_id for product_id in ordered_ids if product_id not in found],
+            },
+        )
+    except Exception as e:
+        return error_response(
+            message="Failed to fetch products",
+            code=500,
+            details=str(e),
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        )
+
+
 # Get detail product
 @router.get(
     "/{product_id}",
@@ -260,18 +776,25 @@ def create_product(request: Request, product: ProductCreate, db: Session = Depen
     responses={404: {"model": ErrorResponse}},
 )
 def read_product(product_id: str, request: Request, db: Session = Depends(get_db)):
-    product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
-    if not product:
+    entry = get_cached_product(db, product_id)
+    if not entry:
         return error_response(
             message="Product not found",
             code=404,
             metadata={"request_id": getattr(request.state, "request_id", None)},
         )
 
-    return success_response(
-        data=Product.model_validate(product).model_dump(),
-        message="Product fetched successfully",
-        metadata={"request_id": getattr(request.state, "request_id", None)},
+    product, etag = entry
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+
+    return with_etag(
+        success_response(
+            data=product,
+            message="Product fetched successfully",
+            metadata={"request_id": getattr(request.state, "request_id", None)},
+        ),
+        etag,
     )
 
 
@@ -292,11 +815,25 @@ def update_product(
             metadata={"request_id": getattr(request.state, "request_id", None)},
         )
 
+    previous_category = db_product.category
+    previous_price = db_product.price
+    previous_image_url = db_product.image_url
     for key, value in product.model_dump(exclude_unset=True).items():
         setattr(db_product, key, value)
 
+    if db_product.category != previous_category:
+        adjust_category_count(db, previous_category, -1)
+        adjust_category_count(db, db_product.category, 1)
+    if db_product.category != previous_category or db_product.price != previous_price:
+        adjust_price_facet(db, previous_category, previous_price, -1)
+        adjust_price_facet(db, db_product.category, db_product.price, 1)
+    if db_product.image_url != previous_image_url:
+        adjust_image_refs(db, previous_image_url, -1)
+        adjust_image_refs(db, db_product.image_url, 1)
+
     db.commit()
     db.refresh(db_product)
+    product_saved(db_product)
 
     return success_response(
         data=Product.model_validate(db_product).model_dump(),
@@ -320,8 +857,13 @@ def delete_product(product_id: str, request: Request, db: Session = Depends(get_
             metadata={"request_id": getattr(request.state, "request_id", None)},
         )
 
+    adjust_category_count(db, db_product.category, -1)
+    adjust_price_facet(db, db_product.category, db_product.price, -1)
+    adjust_image_refs(db, db_product.image_url, -1)
+    record_tombstone(db, product_id)
     db.delete(db_product)
     db.commit()
+    product_deleted(product_id)
 
     return success_response(
         data={"deleted_id": product_id},
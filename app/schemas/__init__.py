@@ -1,5 +1,12 @@
-from app.schemas.product import Product, ProductCreate, ProductUpdate
+from app.schemas.product import (
+    Product,
+    ProductCreate,
+    ProductUpdate,
+    ProductBatchRequest,
+    DirectUploadRequest,
+    DirectUploadComplete,
+)
 from app.schemas.user import User, UserCreate, UserUpdate, AdminUserUpdate
-from app.schemas.cart import Cart, CartCreate, CartItemCreate, CartItemUpdate
+from app.schemas.cart import Cart, CartCreate, CartItemCreate, CartItemUpdate, CartItemOperation, CartItemsPatch
 from app.schemas.order import Order, OrderCreate, OrderItem, OrderItemCreate, OrderStatusUpdate
 from app.schemas.auth import ForgotPasswordRequest, ResetPasswordRequest, VerifyOTPRequest, LoginRequest
@@ -1,8 +1,8 @@
 # app/schemas/cart.py
 import uuid
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Literal
 from app.schemas import Product
 
 # ---------------- CART ITEM ----------------
@@ -16,6 +16,14 @@ class CartItemCreate(CartItemBase):
 class CartItemUpdate(BaseModel):
     quantity: Optional[int] = None
 
+class CartItemOperation(BaseModel):
+    op: Literal["set", "remove"]
+    product_id: uuid.UUID
+    quantity: Optional[int] = None  # required for "set"
+
+class CartItemsPatch(BaseModel):
+    operations: List[CartItemOperation] = Field(..., min_length=1, max_length=100)
+
 class CartItem(CartItemBase):
     id: uuid.UUID
     cart_id: uuid.UUID
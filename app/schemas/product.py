@@ -1,7 +1,9 @@
 import uuid
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, computed_field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
+
+from app.utils.image_variants import variant_urls
 
 class ProductBase(BaseModel):
     name: str = Field(..., max_length=255)
@@ -25,5 +27,25 @@ class Product(ProductBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
+    @computed_field
+    @property
+    def image_variants(self) -> Optional[Dict[str, str]]:
+        # thumbnail / WebP derivatives, only for images uploaded through /products/upload-image
+        return variant_urls(self.image_url)
+
     class Config:
         from_attributes = True
+
+class ProductBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=100)
+
+class DirectUploadRequest(BaseModel):
+    content_type: str
+    size: int = Field(..., gt=0)
+    sha256: str = Field(..., pattern="^[0-9a-f]{64}$")
+    filename: Optional[str] = None
+
+class DirectUploadComplete(BaseModel):
+    sha256: str = Field(..., pattern="^[0-9a-f]{64}$")
+    content_type: str
+    filename: Optional[str] = None
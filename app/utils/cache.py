@@ -0,0 +1,179 @@
+# app/utils/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Small in-process LRU cache with per-entry TTL.
+    Thread-safe (sync routes run in the threadpool). Every instance registers
+    itself by name so hit/miss counters can be reported by cache_stats().
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        # bumped by invalidate() / clear(); a load that overlapped one is not stored
+        self._generation = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        _registry[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] < time.monotonic():
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        # caller holds self._lock
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Cached value, or loader() stored under `key`. Concurrent misses for the
+        same key share one loader call (single flight) instead of each hitting the DB.
+        If the cache is invalidated while the loader runs, its result may predate
+        the write, so it is returned to this caller but not stored.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            generation = self._generation
+
+        def load():
+            # a flight that just finished may have filled the entry
+            with self._lock:
+                entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] >= time.monotonic():
+                return entry[1]
+            value = loader()
+            with self._lock:
+                if self._generation == generation:
+                    self._store(key, value, ttl)
+            return value
+
+        # callers arriving after an invalidation start a new flight instead of
+        # joining one that may have read the old state
+        value, shared = self._flights.do((key, generation), load)
+        if shared:
+            with self._lock:
+                self.coalesced += 1
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "coalesced": self.coalesced,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers wait and share its result."""
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result: Any = None
+            self.error: Optional[BaseException] = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, "SingleFlight._Call"] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> "tuple[Any, bool]":
+        """(result, shared): shared is True when another caller's result was reused."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+
+_registry: Dict[str, TTLCache] = {}
+
+
+def cache_stats() -> List[Dict[str, Any]]:
+    return [cache.stats() for cache in _registry.values()]
+
+
+# -----------------------
+# Table versions
+# -----------------------
+# Bumped after every committed write to a table; cache keys that include the
+# version stop matching as soon as the table changes.
+
+_versions: Dict[str, int] = {}
+_versions_lock = threading.Lock()
+
+
+def bump_version(table_name: str) -> int:
+    with _versions_lock:
+        _versions[table_name] = _versions.get(table_name, 0) + 1
+        return _versions[table_name]
+
+
+def get_version(table_name: str) -> int:
+    return _versions.get(table_name, 0)
@@ -0,0 +1,190 @@
+# app/utils/cart_sweeper.py
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, select, text
+
+from app.models import Cart as CartModel, CartItem as CartItemModel
+from app.utils.carts import cart_deleted
+from app.utils.database import SessionLocal, engine
+
+logger = logging.getLogger("uvicorn.error")
+
+# guest carts (no user) untouched for this long are deleted
+GUEST_CART_TTL_DAYS = float(os.getenv("GUEST_CART_TTL_DAYS", "30"))
+# how often each worker sweeps; 0 disables the background thread
+CART_SWEEP_INTERVAL_SECONDS = float(os.getenv("CART_SWEEP_INTERVAL_SECONDS", "3600"))
+# carts per transaction, and the pause between batches, keep lock time short
+CART_SWEEP_BATCH_SIZE = int(os.getenv("CART_SWEEP_BATCH_SIZE", "500"))
+CART_SWEEP_PAUSE_SECONDS = float(os.getenv("CART_SWEEP_PAUSE_SECONDS", "0.05"))
+CART_SWEEP_MAX_BATCHES = int(os.getenv("CART_SWEEP_MAX_BATCHES", "200"))
+
+# every worker runs the thread; a database advisory lock lets one of them sweep at a time
+SWEEP_LOCK_NAME = "ecommerce_cart_sweeper"
+SWEEP_LOCK_KEY = 0x63617274  # pg_try_advisory_lock takes a bigint
+
+
+def _acquire_sweep_lock():
+    """
+    Connection holding the sweep lock, or None if another process holds it.
+    MySQL GET_LOCK / PostgreSQL advisory locks are session scoped and released
+    with _release_sweep_lock; SQLite deployments are single host, so no lock.
+    """
+    conn = engine.connect()
+    dialect = conn.dialect.name
+    try:
+        if dialect == "mysql":
+            acquired = conn.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": SWEEP_LOCK_NAME}).scalar() == 1
+        elif dialect == "postgresql":
+            acquired = bool(conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": SWEEP_LOCK_KEY}).scalar())
+        else:
+            acquired = True
+        conn.commit()
+    except Exception:
+        conn.close()
+        raise
+    if not acquired:
+        conn.close()
+        return None
+    return conn
+
+
+def _release_sweep_lock(conn) -> None:
+    try:
+        if conn.dialect.name == "mysql":
+            conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": SWEEP_LOCK_NAME})
+        elif conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SWEEP_LOCK_KEY})
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def sweep_idle_guest_carts(
+    ttl_days: Optional[float] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Delete guest carts idle past the TTL, oldest first, one short transaction per
+    batch. Each batch re-checks the cutoff in its DELETEs, so a cart that was
+    touched after it was picked survives. Returns how many rows were reclaimed.
+    """
+    ttl_days = GUEST_CART_TTL_DAYS if ttl_days is None else ttl_days
+    batch_size = batch_size or CART_SWEEP_BATCH_SIZE
+    max_batches = max_batches or CART_SWEEP_MAX_BATCHES
+    cutoff = datetime.utcnow() - timedelta(days=ttl_days)
+    idle = (CartModel.user_id.is_(None), CartModel.last_activity_at < cutoff)
+
+    report = {"carts": 0, "cart_items": 0, "batches": 0, "cutoff": cutoff}
+    started = time.monotonic()
+    while report["batches"] < max_batches:
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(CartModel.id, CartModel.session_token)
+                .where(*idle)
+                .order_by(CartModel.last_activity_at.asc())
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            ids = [row.id for row in rows]
+            still_idle = select(CartModel.id).where(CartModel.id.in_(ids), *idle)
+            report["cart_items"] += db.execute(
+                delete(CartItemModel).where(CartItemModel.cart_id.in_(still_idle))
+            ).rowcount
+            report["carts"] += db.execute(delete(CartModel).where(CartModel.id.in_(ids), *idle)).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        for row in rows:
+            cart_deleted(row.id, session_token=row.session_token)
+        report["batches"] += 1
+        if len(rows) < batch_size:
+            break
+        time.sleep(CART_SWEEP_PAUSE_SECONDS)
+
+    report["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+    return report
+
+
+class CartSweeper:
+    """
+    Background thread running sweep_idle_guest_carts every CART_SWEEP_INTERVAL_SECONDS.
+    Each worker has one; the advisory lock skips a run while another process sweeps.
+    Counters are per process: stats() on the worker that answers the request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.total_carts = 0
+        self.total_cart_items = 0
+        self.skipped = 0
+
+    def start(self) -> None:
+        if CART_SWEEP_INTERVAL_SECONDS <= 0:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name="cart-sweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_once(self, **kwargs) -> Dict[str, Any]:
+        lock = _acquire_sweep_lock()
+        if lock is None:
+            with self._lock:
+                self.skipped += 1
+            return {"skipped": True, "reason": "another process is sweeping"}
+        try:
+            report = sweep_idle_guest_carts(**kwargs)
+        finally:
+            _release_sweep_lock(lock)
+        with self._lock:
+            self.last_report = report
+            self.total_carts += report["carts"]
+            self.total_cart_items += report["cart_items"]
+        if report["carts"]:
+            logger.info(
+                "Cart sweeper removed %s idle guest carts and %s items in %s batches",
+                report["carts"],
+                report["cart_items"],
+                report["batches"],
+            )
+        return report
+
+    def _loop(self) -> None:
+        while not self._stop.wait(CART_SWEEP_INTERVAL_SECONDS):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Cart sweep failed")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ttl_days": GUEST_CART_TTL_DAYS,
+                "interval_seconds": CART_SWEEP_INTERVAL_SECONDS,
+                "total_carts": self.total_carts,
+                "total_cart_items": self.total_cart_items,
+                "skipped": self.skipped,
+                "last_report": self.last_report,
+            }
+
+
+cart_sweeper = CartSweeper()
@@ -0,0 +1,330 @@
+# app/utils/carts.py
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import case, delete, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Cart as CartModel, CartItem as CartItemModel, Product as ProductModel, User as UserModel
+from app.utils.cache import TTLCache, get_version
+from app.utils.catalog import product_entries
+from app.utils.database import upsert_increment_many
+
+CART_CACHE_SIZE = int(os.getenv("CART_CACHE_SIZE", "8192"))
+# invalidation only reaches the worker that made the change: a cart (lines and the
+# product data in it, prices included) served by another worker is at most this old
+CART_CACHE_TTL_SECONDS = float(os.getenv("CART_CACHE_TTL_SECONDS", "5"))
+
+# serialized cart keyed by (cart id, products version): lines and their products are
+# read together, and a product write in this worker moves the version past every entry
+cart_cache = TTLCache("carts", maxsize=CART_CACHE_SIZE, ttl=CART_CACHE_TTL_SECONDS)
+# cart id keyed by ("user", user_id) / ("session", session_token)
+cart_lookup_cache = TTLCache("cart_lookups", maxsize=CART_CACHE_SIZE, ttl=CART_CACHE_TTL_SECONDS)
+
+# reads count as activity for the idle sweeper, but last_activity_at only moves
+# when it is older than this, and each worker rechecks a cart at most once per TTL
+CART_ACTIVITY_RESOLUTION_SECONDS = float(os.getenv("CART_ACTIVITY_RESOLUTION_SECONDS", "86400"))
+cart_activity_cache = TTLCache("cart_activity", maxsize=CART_CACHE_SIZE, ttl=3600)
+
+
+def upsert_cart_item(db: Session, cart_id: str, product_id: str, quantity: int) -> Optional[Tuple[str, int]]:
+    """
+    Add `quantity` of a product to a cart in one statement: INSERT ... SELECT from
+    carts x products (so a missing cart or product inserts nothing) that adds to the
+    existing line on the unique (cart_id, product_id) index instead of duplicating it.
+    Returns (line id, new quantity), or None when the cart or product does not exist.
+    Runs in the caller's transaction.
+    """
+    table = CartItemModel.__table__
+    columns = ["id", "cart_id", "product_id", "quantity"]
+    line_id = str(uuid.uuid4())
+    source = (
+        select(literal(line_id), CartModel.id, ProductModel.id, literal(quantity))
+        .select_from(CartModel)
+        .join(ProductModel, ProductModel.id == product_id)
+        .where(CartModel.id == cart_id)
+    )
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).from_select(columns, source)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["cart_id", "product_id"],
+            set_={"quantity": table.c.quantity + stmt.excluded.quantity},
+        ).returning(table.c.id, table.c.quantity)
+        row = db.execute(stmt).first()
+        return (row.id, row.quantity) if row else None
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).from_select(columns, source)
+        stmt = stmt.on_duplicate_key_update({"quantity": table.c.quantity + stmt.inserted.quantity})
+        if not db.execute(stmt).rowcount:
+            return None
+        # no RETURNING on MySQL: read the line back through the unique index
+        row = db.execute(
+            select(table.c.id, table.c.quantity).where(
+                table.c.cart_id == cart_id, table.c.product_id == product_id
+            )
+        ).first()
+        return (row.id, row.quantity) if row else None
+
+    # other dialects: locked read, then update or insert
+    line = (
+        db.query(CartItemModel)
+        .filter(CartItemModel.cart_id == cart_id, CartItemModel.product_id == product_id)
+        .with_for_update()
+        .first()
+    )
+    if line is None:
+        if db.execute(source).first() is None:
+            return None
+        line = CartItemModel(id=line_id, cart_id=cart_id, product_id=product_id, quantity=0)
+        db.add(line)
+    line.quantity += quantity
+    db.flush()
+    return line.id, line.quantity
+
+
+def lock_user_carts(db: Session, user_id: str) -> None:
+    """
+    Serialize cart creation / hand-over for one user by locking the user row until
+    the caller's transaction ends, so two requests can't both find no cart and each
+    give the user one.
+    """
+    db.execute(select(UserModel.id).where(UserModel.id == str(user_id)).with_for_update())
+
+
+def get_or_create_user_cart(db: Session, user_id: str) -> str:
+    """The user's cart id, creating the cart if needed. Commits when it creates one."""
+    cart_id = find_cart_id(db, user_id=user_id)
+    if cart_id:
+        return cart_id
+
+    lock_user_carts(db, user_id)
+    cart_id = db.execute(select(CartModel.id).where(CartModel.user_id == str(user_id)).limit(1)).scalar()
+    if cart_id is None:
+        cart = CartModel(user_id=str(user_id), session_token=None)
+        db.add(cart)
+        db.flush()
+        cart_id = cart.id
+    db.commit()
+    return cart_id
+
+
+def merge_guest_cart(db: Session, user_id: str, session_token: str) -> Optional[Tuple[str, str]]:
+    """
+    Fold the guest cart of `session_token` into the user's cart and delete it, in
+    the caller's transaction. Lines for the same product add up. Without a user
+    cart the guest cart is simply handed over to the user. Returns
+    (guest cart id, user cart id), or None when there is no guest cart to merge.
+    """
+    lock_user_carts(db, user_id)
+    guest = db.execute(
+        select(CartModel.id)
+        .where(CartModel.session_token == session_token, CartModel.user_id.is_(None))
+        .with_for_update()
+    ).first()
+    if guest is None:
+        return None
+
+    user_cart_id = db.execute(
+        select(CartModel.id).where(CartModel.user_id == str(user_id)).limit(1)
+    ).scalar()
+    if user_cart_id is None:
+        db.execute(
+            update(CartModel)
+            .where(CartModel.id == guest.id)
+            .values(user_id=str(user_id), session_token=None, last_activity_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return guest.id, guest.id
+
+    lines = db.execute(
+        select(CartItemModel.product_id, CartItemModel.quantity).where(CartItemModel.cart_id == guest.id)
+    ).all()
+    if lines:
+        upsert_increment_many(
+            db,
+            CartItemModel.__table__,
+            ["cart_id", "product_id"],
+            ["quantity"],
+            [
+                {
+                    "id": str(uuid.uuid4()),
+                    "cart_id": user_cart_id,
+                    "product_id": line.product_id,
+                    "quantity": line.quantity,
+                }
+                for line in lines
+            ],
+        )
+    db.execute(delete(CartItemModel).where(CartItemModel.cart_id == guest.id))
+    db.execute(delete(CartModel).where(CartModel.id == guest.id))
+    touch_cart(db, user_cart_id)
+    return guest.id, user_cart_id
+
+
+def touch_cart(db: Session, cart_id: str) -> None:
+    """Record activity on a cart (keeps it away from the idle sweeper), in the caller's transaction."""
+    db.execute(
+        update(CartModel)
+        .where(CartModel.id == cart_id)
+        .values(last_activity_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def note_cart_read(db: Session, cart_id: str) -> None:
+    """
+    Record a cart read as activity, rate limited so that reads stay cheap: at most
+    one conditional UPDATE per cart and worker per hour, a real write once per
+    CART_ACTIVITY_RESOLUTION_SECONDS. Best effort, commits on its own.
+    """
+    if cart_activity_cache.get(str(cart_id)) is not None:
+        return
+    cutoff = datetime.utcnow() - timedelta(seconds=CART_ACTIVITY_RESOLUTION_SECONDS)
+    try:
+        db.execute(
+            update(CartModel)
+            .where(CartModel.id == cart_id, CartModel.last_activity_at < cutoff)
+            .values(last_activity_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        return
+    cart_activity_cache.set(str(cart_id), True)
+
+
+def existing_cart_products(db: Session, cart_id: str, product_ids: Iterable[str]) -> Set[str]:
+    """Which of `product_ids` currently have a line in the cart (one query)."""
+    ids = list(product_ids)
+    if not ids:
+        return set()
+    rows = db.execute(
+        select(CartItemModel.product_id).where(
+            CartItemModel.cart_id == cart_id, CartItemModel.product_id.in_(ids)
+        )
+    )
+    return {row.product_id for row in rows}
+
+
+def set_cart_item_quantities(db: Session, cart_id: str, quantities: Dict[str, int]) -> int:
+    """Set the quantity of several lines with one UPDATE ... CASE. Returns rows updated."""
+    if not quantities:
+        return 0
+    return db.execute(
+        update(CartItemModel)
+        .where(CartItemModel.cart_id == cart_id, CartItemModel.product_id.in_(list(quantities)))
+        .values(quantity=case(quantities, value=CartItemModel.product_id))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def remove_cart_items(db: Session, cart_id: str, product_ids: Iterable[str]) -> int:
+    """Delete several lines with one DELETE. Returns rows deleted."""
+    ids = list(product_ids)
+    if not ids:
+        return 0
+    return db.execute(
+        delete(CartItemModel)
+        .where(CartItemModel.cart_id == cart_id, CartItemModel.product_id.in_(ids))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+# -----------------------
+# Read cache
+# -----------------------
+
+def _load_cart(db: Session, cart_id: str) -> Optional[Dict[str, Any]]:
+    cart = db.execute(
+        select(CartModel.id, CartModel.user_id, CartModel.created_at).where(CartModel.id == cart_id)
+    ).first()
+    if cart is None:
+        return None
+    # inner join: a product deleted while still in the cart drops out of it
+    lines = db.execute(
+        select(CartItemModel.id, CartItemModel.product_id, CartItemModel.quantity, ProductModel)
+        .join(ProductModel, ProductModel.id == CartItemModel.product_id)
+        .where(CartItemModel.cart_id == cart_id)
+    ).all()
+    # fresh product rows, so prices are as current as the lines; refreshes product_cache too
+    products = product_entries([line.Product for line in lines])
+    return {
+        "id": uuid.UUID(cart.id),
+        "user_id": uuid.UUID(cart.user_id) if cart.user_id else None,
+        "created_at": cart.created_at,
+        "items": [
+            {
+                "product_id": uuid.UUID(line.product_id),
+                "quantity": line.quantity,
+                "id": uuid.UUID(line.id),
+                "cart_id": uuid.UUID(cart.id),
+                "product": payload,
+            }
+            for line, (payload, _) in zip(lines, products)
+        ],
+    }
+
+
+def _cart_key(cart_id: str) -> Tuple[str, int]:
+    return str(cart_id), get_version("products")
+
+
+def get_cart_payload(db: Session, cart_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Serialized cart (same shape as the Cart schema dump), or None if it does not exist.
+    A warm read runs no queries and no model validation; a miss reads the lines and
+    their products in two queries.
+    """
+    key = _cart_key(cart_id)
+    cart = cart_cache.get_or_load(key, lambda: _load_cart(db, cart_id))
+    if cart is None:
+        cart_cache.invalidate(key)
+    return cart
+
+
+def find_cart_id(db: Session, user_id: Optional[str] = None, session_token: Optional[str] = None) -> Optional[str]:
+    """Cart id for a user or a guest session token, cached."""
+    if user_id:
+        key, condition = ("user", str(user_id)), CartModel.user_id == str(user_id)
+    else:
+        key, condition = ("session", session_token), CartModel.session_token == session_token
+
+    def load():
+        return db.execute(select(CartModel.id).where(condition).limit(1)).scalar()
+
+    cart_id = cart_lookup_cache.get_or_load(key, load)
+    if cart_id is None:
+        cart_lookup_cache.invalidate(key)
+    return cart_id
+
+
+def cart_changed(cart_id: str) -> None:
+    """Call after a cart's lines have been changed and committed."""
+    cart_cache.invalidate(_cart_key(cart_id))
+
+
+def cart_merged(guest_cart_id: str, session_token: str, user_id: str, user_cart_id: str) -> None:
+    """Call after merge_guest_cart has been committed."""
+    cart_deleted(guest_cart_id, session_token=session_token)
+    cart_changed(user_cart_id)
+    cart_lookup_cache.invalidate(("user", str(user_id)))
+
+
+def cart_deleted(cart_id: str, user_id: Optional[str] = None, session_token: Optional[str] = None) -> None:
+    """Call after a cart has been deleted and committed."""
+    cart_cache.invalidate(_cart_key(cart_id))
+    if user_id:
+        cart_lookup_cache.invalidate(("user", str(user_id)))
+    if session_token:
+        cart_lookup_cache.invalidate(("session", session_token))
@@ -0,0 +1,179 @@
+# app/utils/catalog.py
+import os
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Product as ProductModel, ProductCategory as ProductCategoryModel
+from app.schemas import Product as ProductSchema
+from app.utils.cache import TTLCache, bump_version
+from app.utils.catalog_snapshot import snapshot_builder
+from app.utils.database import upsert_increment, upsert_increment_many
+from app.utils.fuzzy import trigram_index
+from app.utils.response import make_etag
+from app.utils.suggestions import suggestion_index
+
+PRODUCT_CACHE_SIZE = int(os.getenv("PRODUCT_CACHE_SIZE", "4096"))
+PRODUCT_CACHE_TTL_SECONDS = float(os.getenv("PRODUCT_CACHE_TTL_SECONDS", "300"))
+PRODUCT_LIST_CACHE_SIZE = int(os.getenv("PRODUCT_LIST_CACHE_SIZE", "2048"))
+PRODUCT_LIST_CACHE_TTL_SECONDS = float(os.getenv("PRODUCT_LIST_CACHE_TTL_SECONDS", "30"))
+
+# (serialized Product payload, ETag) keyed by product id
+product_cache = TTLCache("products", maxsize=PRODUCT_CACHE_SIZE, ttl=PRODUCT_CACHE_TTL_SECONDS)
+# product list / search results (page of ids + pagination, facets...) keyed by
+# products version and normalized query params; payloads come from product_cache
+product_list_cache = TTLCache(
+    "product_lists", maxsize=PRODUCT_LIST_CACHE_SIZE, ttl=PRODUCT_LIST_CACHE_TTL_SECONDS
+)
+
+
+def serialize_product(product: ProductModel) -> dict:
+    return ProductSchema.model_validate(product).model_dump()
+
+
+def get_cached_product(db: Session, product_id: str) -> Optional[Tuple[dict, str]]:
+    """
+    Read-through: (serialized product, ETag) from the cache, loading it on a miss.
+    The ETag is hashed once when the entry is filled, so revalidation is free.
+    """
+    entry = product_cache.get(product_id)
+    if entry is not None:
+        return entry
+
+    product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
+    if not product:
+        return None
+
+    return _cache_product(product)
+
+
+def _cache_product(product: ProductModel) -> Tuple[dict, str]:
+    payload = serialize_product(product)
+    entry = (payload, make_etag(payload))
+    product_cache.set(str(product.id), entry)
+    return entry
+
+
+def product_entries(products: List[ProductModel]) -> List[Tuple[dict, str]]:
+    """
+    (payload, ETag) for already-loaded product rows, reusing cached entries whose
+    updated_at still matches the row and caching the rest.
+    """
+    entries = []
+    for product in products:
+        product_id = str(product.id)
+        entry = product_cache.get(product_id)
+        if entry is None or entry[0].get("updated_at") != product.updated_at:
+            entry = _cache_product(product)
+        entries.append(entry)
+    return entries
+
+
+def get_product_entries(db: Session, product_ids: List[str]) -> List[Tuple[dict, str]]:
+    """(payload, ETag) for ids in order, cache first then one IN query; unknown ids are skipped."""
+    entries: Dict[str, Tuple[dict, str]] = {}
+    misses = []
+    for product_id in dict.fromkeys(product_ids):
+        entry = product_cache.get(product_id)
+        if entry is not None:
+            entries[product_id] = entry
+        else:
+            misses.append(product_id)
+
+    if misses:
+        for product in db.query(ProductModel).filter(ProductModel.id.in_(misses)).all():
+            entries[str(product.id)] = _cache_product(product)
+    return [entries[product_id] for product_id in product_ids if product_id in entries]
+
+
+def get_product_payloads(db: Session, product_ids: List[str]) -> Dict[str, dict]:
+    """Serialized products by id: cache hits first, then one IN query for the misses."""
+    payloads: Dict[str, dict] = {}
+    misses = []
+    for product_id in dict.fromkeys(product_ids):
+        entry = product_cache.get(product_id)
+        if entry is not None:
+            payloads[product_id] = entry[0]
+        else:
+            misses.append(product_id)
+
+    if misses:
+        products = db.query(ProductModel).filter(ProductModel.id.in_(misses)).all()
+        for product in products:
+            payloads[str(product.id)] = _cache_product(product)[0]
+    return payloads
+
+
+def get_product_payload(db: Session, product_id: str) -> Optional[dict]:
+    entry = get_cached_product(db, product_id)
+    return entry[0] if entry else None
+
+
+def product_saved(product: ProductModel) -> None:
+    """Call after a product create/update has been committed."""
+    bump_version("products")
+    product_cache.invalidate(str(product.id))
+    suggestion_index.upsert(product.id, product.name)
+    trigram_index.upsert(product.id, product.name, product.category)
+    snapshot_builder.schedule()
+
+
+def product_deleted(product_id: str) -> None:
+    """Call after a product delete has been committed."""
+    bump_version("products")
+    product_cache.invalidate(str(product_id))
+    suggestion_index.remove(product_id)
+    trigram_index.remove(product_id)
+    snapshot_builder.schedule()
+
+
+def products_imported(rows: List[dict]) -> None:
+    """Call after a bulk insert of new product rows has been committed."""
+    bump_version("products")
+    suggestion_index.upsert_many((row["id"], row["name"]) for row in rows)
+    for row in rows:
+        trigram_index.upsert(row["id"], row["name"], row["category"])
+    snapshot_builder.schedule()
+
+
+# -----------------------
+# Category summary
+# -----------------------
+
+def adjust_category_count(db: Session, category: Optional[str], delta: int) -> None:
+    """
+    Add `delta` products to a category in product_categories.
+    Runs inside the caller's transaction, before the product write is committed.
+    """
+    if not category or not delta:
+        return
+
+    table = ProductCategoryModel.__table__
+    if delta > 0:
+        upsert_increment(db, table, {"name": category}, {"product_count": delta})
+        return
+
+    db.execute(
+        table.update()
+        .where(table.c.name == category)
+        .values(product_count=table.c.product_count + delta)
+    )
+    db.execute(table.delete().where(table.c.name == category, table.c.product_count <= 0))
+
+
+def add_category_counts(db: Session, counts: Dict[Optional[str], int]) -> None:
+    """adjust_category_count for many categories at once (positive deltas, e.g. an import chunk): one statement."""
+    rows = [
+        {"name": name, "product_count": count}
+        for name, count in sorted((name, count) for name, count in counts.items() if name and count > 0)
+    ]
+    upsert_increment_many(db, ProductCategoryModel.__table__, ["name"], ["product_count"], rows)
+
+
+def list_categories(db: Session) -> List[ProductCategoryModel]:
+    return (
+        db.query(ProductCategoryModel)
+        .filter(ProductCategoryModel.product_count > 0)
+        .order_by(ProductCategoryModel.name.asc())
+        .all()
+    )
@@ -0,0 +1,182 @@
+# app/utils/catalog_snapshot.py
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select
+
+from app.models import Product as ProductModel, ProductCategory as ProductCategoryModel
+from app.schemas import Product as ProductSchema
+from app.utils.database import SessionLocal
+
+try:
+    import brotli
+except ImportError:  # brotli variants are skipped, gzip is always written
+    brotli = None
+
+logger = logging.getLogger("uvicorn.error")
+
+CATALOG_SNAPSHOT_ENABLED = os.getenv("CATALOG_SNAPSHOT_ENABLED", "false").lower() in ("1", "true", "yes")
+SNAPSHOT_PAGE_SIZE = int(os.getenv("SNAPSHOT_PAGE_SIZE", "50"))
+# rebuild once writes have been quiet this long, but never later than the max delay
+SNAPSHOT_DEBOUNCE_SECONDS = float(os.getenv("SNAPSHOT_DEBOUNCE_SECONDS", "5"))
+SNAPSHOT_MAX_DELAY_SECONDS = float(os.getenv("SNAPSHOT_MAX_DELAY_SECONDS", "60"))
+# older versions stay around briefly for clients that read the previous manifest
+SNAPSHOT_KEEP_VERSIONS = int(os.getenv("SNAPSHOT_KEEP_VERSIONS", "3"))
+
+SNAPSHOT_ROOT = Path(__file__).resolve().parents[2] / "snapshots" / "catalog"
+SNAPSHOT_ROOT.mkdir(parents=True, exist_ok=True)
+SNAPSHOT_URL_PREFIX = "/catalog/"
+MANIFEST_NAME = "manifest.json"
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(jsonable_encoder(data), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    """The JSON plus .gz / .br siblings, each written to a temp name and renamed into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    variants = {"": data, ".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data)
+    for suffix, body in variants.items():
+        target = path.with_name(path.name + suffix)
+        partial = target.with_name(f".{target.name}.part")
+        partial.write_bytes(body)
+        os.replace(partial, target)
+
+
+class SnapshotBuilder:
+    """
+    Writes the anonymous catalog (newest-first product pages and the category
+    list) as static JSON under SNAPSHOT_ROOT, served from /catalog.
+
+    Each build goes to a new version directory; manifest.json, replaced last,
+    points at the current one, so readers never see a half-written snapshot and
+    everything except the manifest can be cached forever.
+    """
+
+    def __init__(self, root: Path = SNAPSHOT_ROOT):
+        self.root = root
+        # builds are written next to the served root, not inside it (same filesystem,
+        # so the final os.replace is atomic)
+        self.staging_root = root.parent / f".{root.name}-staging"
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._pending_since: Optional[float] = None
+
+    def schedule(self) -> None:
+        """Debounced rebuild; call after product writes are committed."""
+        if not CATALOG_SNAPSHOT_ENABLED:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._pending_since is None:
+                self._pending_since = now
+            if self._timer is not None:
+                self._timer.cancel()
+            deadline = self._pending_since + SNAPSHOT_MAX_DELAY_SECONDS
+            self._timer = threading.Timer(max(min(SNAPSHOT_DEBOUNCE_SECONDS, deadline - now), 0), self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._pending_since = None
+        try:
+            self.build()
+        except Exception:
+            logger.exception("Catalog snapshot build failed")
+
+    def build(self) -> Dict[str, Any]:
+        with self._build_lock:
+            version = str(int(time.time() * 1000))
+            staging = self.staging_root / version
+            db = SessionLocal()
+            try:
+                total = db.execute(select(func.count()).select_from(ProductModel)).scalar_one()
+                total_pages = max((total + SNAPSHOT_PAGE_SIZE - 1) // SNAPSHOT_PAGE_SIZE, 1)
+
+                stmt = (
+                    select(ProductModel)
+                    .order_by(ProductModel.created_at.desc(), ProductModel.id.desc())
+                    .execution_options(yield_per=SNAPSHOT_PAGE_SIZE)
+                )
+                page = 1
+                batch: List[dict] = []
+                for product in db.execute(stmt).scalars():
+                    batch.append(ProductSchema.model_validate(product).model_dump())
+                    if len(batch) == SNAPSHOT_PAGE_SIZE:
+                        self._write_page(staging, page, total, total_pages, batch)
+                        page, batch = page + 1, []
+                if batch or page == 1:
+                    self._write_page(staging, page, total, total_pages, batch)
+
+                categories = (
+                    db.query(ProductCategoryModel)
+                    .filter(ProductCategoryModel.product_count > 0)
+                    .order_by(ProductCategoryModel.name.asc())
+                    .all()
+                )
+                _write_file(
+                    staging / "categories.json",
+                    _dumps([{"name": row.name, "product_count": row.product_count} for row in categories]),
+                )
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+            finally:
+                db.close()
+
+            os.replace(staging, self.root / version)
+            manifest = {
+                "version": version,
+                "generated_at": datetime.utcnow(),
+                "page_size": SNAPSHOT_PAGE_SIZE,
+                "total": total,
+                "total_pages": total_pages,
+                "pages": f"{SNAPSHOT_URL_PREFIX}{version}/products/page-{{page}}.json",
+                "categories": f"{SNAPSHOT_URL_PREFIX}{version}/categories.json",
+            }
+            _write_file(self.root / MANIFEST_NAME, _dumps(manifest))
+            self._prune()
+            return manifest
+
+    @staticmethod
+    def _write_page(staging: Path, page: int, total: int, total_pages: int, products: List[dict]) -> None:
+        _write_file(
+            staging / "products" / f"page-{page}.json",
+            _dumps(
+                {
+                    "page": page,
+                    "per_page": SNAPSHOT_PAGE_SIZE,
+                    "total": total,
+                    "total_pages": total_pages,
+                    "has_next": page < total_pages,
+                    "has_prev": page > 1,
+                    "data": products,
+                }
+            ),
+        )
+
+    def _prune(self) -> None:
+        versions = sorted(
+            (path for path in self.root.iterdir() if path.is_dir() and path.name.isdigit()),
+            key=lambda path: int(path.name),
+        )
+        for path in versions[:-SNAPSHOT_KEEP_VERSIONS]:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+snapshot_builder = SnapshotBuilder()
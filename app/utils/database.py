@@ -13,3 +13,65 @@ engine = create_engine(
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
+
+
+def upsert_increment(db, table, keys: dict, increments: dict, extra: dict | None = None) -> None:
+    """
+    Insert a row, or add `increments` to the existing row with the same `keys`,
+    in a single statement. `keys` must be covered by a primary key / unique index.
+    `extra` columns are only written when the row is inserted.
+    """
+    upsert_increment_many(db, table, list(keys), list(increments), [{**keys, **increments, **(extra or {})}])
+
+
+def upsert_increment_many(db, table, key_columns: list, increment_columns: list, rows: list) -> None:
+    """
+    Multi-row form of upsert_increment: one INSERT of all `rows`, where a row whose
+    `key_columns` already exist adds its `increment_columns` to that row instead.
+    Dialects without an upsert statement fall back to UPDATE, then INSERT per row.
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={name: table.c[name] + stmt.excluded[name] for name in increment_columns},
+        )
+    elif dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_duplicate_key_update(
+            {name: table.c[name] + stmt.inserted[name] for name in increment_columns}
+        )
+    else:
+        _update_or_insert_many(db, table, key_columns, increment_columns, rows)
+        return
+
+    db.execute(stmt)
+
+
+def _update_or_insert_many(db, table, key_columns: list, increment_columns: list, rows: list) -> None:
+    """Fallback for dialects without an upsert: UPDATE each row, INSERT it when nothing matched."""
+    from sqlalchemy import and_
+    from sqlalchemy.exc import IntegrityError
+
+    for row in rows:
+        match = and_(*(table.c[name] == row[name] for name in key_columns))
+        update = table.update().where(match).values(
+            {name: table.c[name] + row[name] for name in increment_columns}
+        )
+        if db.execute(update).rowcount:
+            continue
+        try:
+            with db.begin_nested():
+                db.execute(table.insert().values(row))
+        except IntegrityError:
+            # another transaction inserted the row after our UPDATE
+            db.execute(update)
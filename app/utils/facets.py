@@ -0,0 +1,192 @@
+# app/utils/facets.py
+import bisect
+import os
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import Query, Session
+
+from app.models import Product as ProductModel, ProductPriceBucket as ProductPriceBucketModel
+from app.utils.cache import TTLCache, get_version
+from app.utils.database import upsert_increment, upsert_increment_many
+
+FACET_CACHE_TTL_SECONDS = float(os.getenv("FACET_CACHE_TTL_SECONDS", "60"))
+
+# upper bounds (exclusive) of the price buckets; the last bucket is open-ended.
+# Changing these needs product_price_buckets rebuilt (see the migration backfill).
+PRICE_BUCKET_BOUNDS = (10, 25, 50, 100, 250, 500, 1000)
+
+# product_price_buckets is small (categories x buckets); read it whole per products version
+facet_cache = TTLCache("facets", maxsize=8, ttl=FACET_CACHE_TTL_SECONDS)
+
+UNCATEGORIZED = ""
+
+
+def price_bucket(price) -> int:
+    return bisect.bisect_right(PRICE_BUCKET_BOUNDS, Decimal(str(price)))
+
+
+def bucket_range(bucket: int) -> Tuple[Optional[int], Optional[int]]:
+    low = PRICE_BUCKET_BOUNDS[bucket - 1] if bucket > 0 else 0
+    high = PRICE_BUCKET_BOUNDS[bucket] if bucket < len(PRICE_BUCKET_BOUNDS) else None
+    return low, high
+
+
+def buckets_within(min_price: Optional[float], max_price: Optional[float]) -> range:
+    """Buckets lying entirely inside [min_price, max_price]; the partial edge buckets are left out."""
+    first = price_bucket(min_price) if min_price is not None else 0
+    if bucket_range(first)[0] < (min_price or 0):
+        first += 1
+    if max_price is None:
+        return range(first, len(PRICE_BUCKET_BOUNDS) + 1)
+    # bucket b is covered when its exclusive upper bound is <= max_price
+    return range(first, bisect.bisect_right(PRICE_BUCKET_BOUNDS, Decimal(str(max_price))))
+
+
+def _price_conditions(min_price: Optional[float], max_price: Optional[float]) -> list:
+    conditions = []
+    if min_price is not None:
+        conditions.append(ProductModel.price >= min_price)
+    if max_price is not None:
+        conditions.append(ProductModel.price <= max_price)
+    return conditions
+
+
+def adjust_price_facet(db: Session, category: Optional[str], price, delta: int) -> None:
+    """
+    Add `delta` products to the (category, price bucket) cell in product_price_buckets.
+    Runs inside the caller's transaction, like adjust_category_count.
+    """
+    if price is None:
+        return
+    adjust_price_bucket(db, category, price_bucket(price), delta)
+
+
+def adjust_price_bucket(db: Session, category: Optional[str], bucket: int, delta: int) -> None:
+    if not delta:
+        return
+
+    table = ProductPriceBucketModel.__table__
+    keys = {"category": category or UNCATEGORIZED, "bucket": bucket}
+    if delta > 0:
+        upsert_increment(db, table, keys, {"product_count": delta})
+        return
+
+    match = (table.c.category == keys["category"]) & (table.c.bucket == keys["bucket"])
+    db.execute(table.update().where(match).values(product_count=table.c.product_count + delta))
+    db.execute(table.delete().where(match, table.c.product_count <= 0))
+
+
+def add_price_bucket_counts(db: Session, counts: Dict[Tuple[Optional[str], int], int]) -> None:
+    """adjust_price_bucket for many (category, bucket) cells at once (positive deltas): one statement."""
+    cells: Dict[Tuple[str, int], int] = {}
+    for (category, bucket), count in counts.items():
+        if count > 0:
+            key = (category or UNCATEGORIZED, bucket)
+            cells[key] = cells.get(key, 0) + count
+    rows = [
+        {"category": category, "bucket": bucket, "product_count": count}
+        for (category, bucket), count in sorted(cells.items())
+    ]
+    upsert_increment_many(db, ProductPriceBucketModel.__table__, ["category", "bucket"], ["product_count"], rows)
+
+
+def _facet_cells(db: Session) -> List[Tuple[str, int, int]]:
+    key = get_version("products")
+    cells = facet_cache.get(key)
+    if cells is None:
+        cells = [
+            (row.category, row.bucket, row.product_count)
+            for row in db.query(ProductPriceBucketModel).filter(ProductPriceBucketModel.product_count > 0)
+        ]
+        facet_cache.set(key, cells)
+    return cells
+
+
+def _format_facets(categories: Dict[str, int], buckets: Dict[int, int]) -> dict:
+    return {
+        "category": [
+            {"value": name, "count": count}
+            for name, count in sorted(categories.items(), key=lambda item: (-item[1], item[0]))
+            if name != UNCATEGORIZED
+        ],
+        "price": [
+            {"min": bucket_range(bucket)[0], "max": bucket_range(bucket)[1], "count": buckets[bucket]}
+            for bucket in sorted(buckets)
+        ],
+    }
+
+
+def _count_buckets(cells: List[Tuple[str, int, int]], category: Optional[str]) -> Dict[int, int]:
+    buckets: Dict[int, int] = {}
+    for cell_category, bucket, count in cells:
+        if category is None or cell_category == category:
+            buckets[bucket] = buckets.get(bucket, 0) + count
+    return buckets
+
+
+def facet_counts(
+    db: Session,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+) -> dict:
+    """
+    Category and price-bucket counts from the maintained index. Each facet ignores its
+    own filter (so the sidebar can offer alternatives) and applies the other one.
+    With a price range, the buckets it covers whole come from the index and the (at
+    most two) partial edge buckets from a range count on the indexed price column,
+    so the category counts match the filtered results exactly.
+    """
+    cells = _facet_cells(db)
+    conditions = _price_conditions(min_price, max_price)
+    covered = buckets_within(min_price, max_price)
+
+    categories: Dict[str, int] = {}
+    for cell_category, bucket, count in cells:
+        if bucket in covered:
+            categories[cell_category] = categories.get(cell_category, 0) + count
+
+    if conditions:
+        if covered:
+            low, high = bucket_range(covered[0])[0], bucket_range(covered[-1])[1]
+            outside = ProductModel.price < low
+            conditions.append(outside if high is None else or_(outside, ProductModel.price >= high))
+        category_column = func.coalesce(ProductModel.category, UNCATEGORIZED)
+        edges = db.query(category_column, func.count()).filter(*conditions).group_by(category_column)
+        for cell_category, count in edges:
+            categories[cell_category] = categories.get(cell_category, 0) + count
+
+    return _format_facets(categories, _count_buckets(cells, category))
+
+
+def query_facet_counts(
+    query: Query,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+) -> dict:
+    """
+    facet_counts for a search the index cannot answer: one GROUP BY over the rows
+    matching `query` (search applied, category / price filters not yet applied),
+    with an in-range flag so the category facet applies the exact price filter.
+    """
+    bucket = case(
+        *[(ProductModel.price < bound, index) for index, bound in enumerate(PRICE_BUCKET_BOUNDS)],
+        else_=len(PRICE_BUCKET_BOUNDS),
+    )
+    conditions = _price_conditions(min_price, max_price)
+    groups = [func.coalesce(ProductModel.category, UNCATEGORIZED), bucket]
+    if conditions:
+        groups.append(case((and_(*conditions), 1), else_=0))
+    rows = query.order_by(None).with_entities(*groups, func.count()).group_by(*groups).all()
+
+    categories: Dict[str, int] = {}
+    cells: List[Tuple[str, int, int]] = []
+    for row in rows:
+        cell_category, cell_bucket, count = row[0], row[1], row[-1]
+        if not conditions or row[2]:
+            categories[cell_category] = categories.get(cell_category, 0) + count
+        cells.append((cell_category, cell_bucket, count))
+    return _format_facets(categories, _count_buckets(cells, category))
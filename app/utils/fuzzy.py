@@ -0,0 +1,187 @@
+# app/utils/fuzzy.py
+import heapq
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Product as ProductModel
+from app.utils.search import tokenize
+
+# full rebuild interval; picks up writes made by other workers
+FUZZY_REBUILD_SECONDS = float(os.getenv("FUZZY_REBUILD_SECONDS", "600"))
+# pg_trgm's default similarity threshold
+FUZZY_MIN_SIMILARITY = float(os.getenv("FUZZY_MIN_SIMILARITY", "0.3"))
+# vocabulary words scored exactly per query token, and products returned per search
+FUZZY_WORD_CANDIDATES = int(os.getenv("FUZZY_WORD_CANDIDATES", "50"))
+FUZZY_MAX_RESULTS = int(os.getenv("FUZZY_MAX_RESULTS", "500"))
+_MEMO_SIZE = 4096
+
+
+def trigrams(word: str) -> FrozenSet[str]:
+    """pg_trgm style: the word padded with two leading blanks and one trailing."""
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramIndex:
+    """
+    In-memory trigram index over the words of product names and categories.
+    A query token is matched against the vocabulary (trigram -> words), so a
+    typo such as "keybord" still finds "keyboard"; matching words map back to
+    products (word -> product ids). Every token of the query must match a word.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # one rebuild at a time; the others keep reading the current index
+        self._rebuild_lock = threading.Lock()
+        self._docs: Dict[str, FrozenSet[str]] = {}
+        self._word_products: Dict[str, Set[str]] = {}
+        self._gram_words: Dict[str, Set[str]] = {}
+        self._memo: Dict[Tuple[str, int], List[Tuple[str, float]]] = {}
+        self._loaded_at: Optional[float] = None
+
+    @staticmethod
+    def _words_for(name: Optional[str], category: Optional[str]) -> FrozenSet[str]:
+        return frozenset(tokenize(f"{name or ''} {category or ''}"))
+
+    def _add_locked(self, product_id: str, words: FrozenSet[str]) -> None:
+        self._docs[product_id] = words
+        for word in words:
+            products = self._word_products.get(word)
+            if products is None:
+                products = self._word_products[word] = set()
+                for gram in trigrams(word):
+                    self._gram_words.setdefault(gram, set()).add(word)
+            products.add(product_id)
+
+    def _remove_locked(self, product_id: str) -> None:
+        words = self._docs.pop(product_id, None)
+        if words is None:
+            return
+        for word in words:
+            products = self._word_products.get(word)
+            if products is None:
+                continue
+            products.discard(product_id)
+            if not products:
+                del self._word_products[word]
+                for gram in trigrams(word):
+                    grams = self._gram_words.get(gram)
+                    if grams is not None:
+                        grams.discard(word)
+                        if not grams:
+                            del self._gram_words[gram]
+
+    def load(self, db: Session) -> None:
+        products = db.query(ProductModel.id, ProductModel.name, ProductModel.category).all()
+        with self._lock:
+            self._docs = {}
+            self._word_products = {}
+            self._gram_words = {}
+            for product_id, name, category in products:
+                self._add_locked(str(product_id), self._words_for(name, category))
+            self._memo = {}
+            self._loaded_at = time.monotonic()
+
+    def _is_stale(self) -> bool:
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > FUZZY_REBUILD_SECONDS
+
+    def ensure_loaded(self, db: Session) -> None:
+        """
+        Load on first use, rebuild when older than FUZZY_REBUILD_SECONDS.
+        Only one caller rebuilds: on a cold start the others wait for it, once an
+        index exists they carry on with the old one.
+        """
+        if not self._is_stale():
+            return
+        cold = self._loaded_at is None
+        if not self._rebuild_lock.acquire(blocking=cold):
+            return
+        try:
+            if self._is_stale():
+                self.load(db)
+        finally:
+            self._rebuild_lock.release()
+
+    def upsert(self, product_id: str, name: str, category: Optional[str]) -> None:
+        product_id = str(product_id)
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove_locked(product_id)
+            self._add_locked(product_id, self._words_for(name, category))
+            self._memo = {}
+
+    def remove(self, product_id: str) -> None:
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove_locked(str(product_id))
+            self._memo = {}
+
+    def _similar_words(self, token: str) -> Dict[str, float]:
+        """Vocabulary words with trigram similarity >= FUZZY_MIN_SIMILARITY to `token`."""
+        grams = trigrams(token)
+        overlap = Counter()
+        for gram in grams:
+            overlap.update(self._gram_words.get(gram, ()))
+
+        # only the words sharing the most trigrams are scored exactly
+        similar = {}
+        for word, shared in heapq.nlargest(FUZZY_WORD_CANDIDATES, overlap.items(), key=lambda item: item[1]):
+            score = shared / (len(grams) + len(trigrams(word)) - shared)
+            if score >= FUZZY_MIN_SIMILARITY:
+                similar[word] = score
+        return similar
+
+    def search(self, q: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        (product_id, similarity) for the best fuzzy matches, best first. Similarity is
+        the mean over query tokens of the best word match, in (0, 1].
+        """
+        limit = FUZZY_MAX_RESULTS if limit is None else limit
+        tokens = list(dict.fromkeys(tokenize(q)))
+        if not tokens:
+            return []
+        memo_key = (" ".join(tokens), limit)
+
+        with self._lock:
+            cached = self._memo.get(memo_key)
+            if cached is not None:
+                return cached
+
+            scores: Optional[Dict[str, float]] = None
+            for token in tokens:
+                token_scores: Dict[str, float] = {}
+                for word, score in self._similar_words(token).items():
+                    for product_id in self._word_products[word]:
+                        if scores is not None and product_id not in scores:
+                            continue
+                        if score > token_scores.get(product_id, 0.0):
+                            token_scores[product_id] = score
+                scores = (
+                    token_scores
+                    if scores is None
+                    else {product_id: scores[product_id] + score for product_id, score in token_scores.items()}
+                )
+                if not scores:
+                    break
+
+            result = [
+                (product_id, round(total / len(tokens), 4))
+                for product_id, total in heapq.nlargest(limit, (scores or {}).items(), key=lambda item: item[1])
+            ]
+
+            if len(self._memo) >= _MEMO_SIZE:
+                self._memo = {}
+            self._memo[memo_key] = result
+            return result
+
+
+trigram_index = TrigramIndex()
@@ -0,0 +1,156 @@
+# app/utils/image_variants.py
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.utils.images import IMAGE_ROOT, IMAGE_URL_PREFIX, VARIANT_ROOT, image_hash_from_url
+from app.utils.storage import get_storage
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it only originals are served
+    Image = None
+
+logger = logging.getLogger("uvicorn.error")
+
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", "2"))
+VARIANT_URL_PREFIX = f"{IMAGE_URL_PREFIX}variants/"
+
+# name -> longest edge in px (None keeps the original size)
+VARIANT_SIZES: Dict[str, Optional[int]] = {"thumb": 160, "medium": 640, "full": None}
+# full-size is only produced as WebP; the original covers the fallback
+VARIANT_FORMATS = {"jpg": "JPEG", "webp": "WEBP"}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def variants_enabled() -> bool:
+    # variants are rendered from and served as local files
+    return Image is not None and get_storage().serves_locally
+
+
+def variant_name(sha256: str, variant: str, fmt: str) -> str:
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}_{variant}.{fmt}"
+
+
+def variant_urls(image_url: Optional[str]) -> Optional[Dict[str, str]]:
+    """
+    Derivative URLs for a content-addressed product image, e.g.
+    {"thumb": ..._thumb.jpg, "thumb_webp": ..._thumb.webp, ..., "webp": ..._full.webp}.
+    None for external / legacy images or when Pillow is not installed.
+    """
+    sha256 = image_hash_from_url(image_url)
+    if not sha256 or not variants_enabled():
+        return None
+
+    base = image_url[: image_url.index(IMAGE_URL_PREFIX)] + VARIANT_URL_PREFIX
+    urls = {}
+    for variant, size in VARIANT_SIZES.items():
+        for fmt in VARIANT_FORMATS:
+            if size is None and fmt != "webp":
+                continue
+            key = "webp" if size is None else (variant if fmt == "jpg" else f"{variant}_{fmt}")
+            urls[key] = base + variant_name(sha256, variant, fmt)
+    return urls
+
+
+def _parse_variant_path(relative: str):
+    """'ab/cd/<sha>_thumb.webp' -> (sha, 'thumb', 'webp') or None."""
+    name = Path(relative).name
+    stem, _, fmt = name.rpartition(".")
+    sha256, _, variant = stem.rpartition("_")
+    if (
+        len(sha256) != 64
+        or variant not in VARIANT_SIZES
+        or fmt not in VARIANT_FORMATS
+        or relative != variant_name(sha256, variant, fmt)
+    ):
+        return None
+    return sha256, variant, fmt
+
+
+def _find_source(sha256: str) -> Optional[Path]:
+    directory = IMAGE_ROOT / sha256[:2] / sha256[2:4]
+    for candidate in directory.glob(f"{sha256}.*"):
+        return candidate
+    return None
+
+
+def render_variants(sha256: str, only: Optional[str] = None) -> List[str]:
+    """
+    Write missing derivatives for one source image (all of them, or just `only`,
+    a relative variant path). Runs in a worker process; returns the paths written.
+    """
+    source = _find_source(sha256)
+    if source is None:
+        return []
+
+    written = []
+    with Image.open(source) as original:
+        original = ImageOps.exif_transpose(original)
+        for variant, size in VARIANT_SIZES.items():
+            for fmt, pil_format in VARIANT_FORMATS.items():
+                if size is None and fmt != "webp":
+                    continue
+                relative = variant_name(sha256, variant, fmt)
+                target = VARIANT_ROOT / relative
+                if (only and relative != only) or target.exists():
+                    continue
+
+                image = original.copy()
+                if size:
+                    image.thumbnail((size, size))
+                if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+
+                target.parent.mkdir(parents=True, exist_ok=True)
+                partial = target.with_name(f".{target.name}.{os.getpid()}.part")
+                image.save(partial, format=pil_format, quality=82, optimize=True)
+                os.replace(partial, target)
+                written.append(relative)
+    return written
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=IMAGE_VARIANT_WORKERS)
+    return _executor
+
+
+def schedule_variants(sha256: str) -> None:
+    """Fire-and-forget generation of every derivative after an upload."""
+    if not variants_enabled():
+        return
+    future = _get_executor().submit(render_variants, sha256)
+    future.add_done_callback(_log_failure)
+
+
+def _log_failure(future) -> None:
+    error = future.exception()
+    if error:
+        logger.warning("Image variant generation failed: %s", error)
+
+
+async def ensure_variant(relative: str) -> bool:
+    """
+    Lazily render a single derivative that was requested before the background
+    job finished (or was cleaned up). Returns True when the file now exists.
+    """
+    parsed = _parse_variant_path(relative)
+    if not parsed or not variants_enabled():
+        return False
+    if (VARIANT_ROOT / relative).exists():
+        return True
+
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(_get_executor(), render_variants, parsed[0], relative)
+    except Exception as e:
+        logger.warning("Image variant generation failed for %s: %s", relative, e)
+        return False
+    return (VARIANT_ROOT / relative).exists()
+
@@ -0,0 +1,173 @@
+# app/utils/images.py
+import mimetypes
+import os
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import case, select
+from sqlalchemy.orm import Session
+
+from app.models import ProductImage as ProductImageModel
+from app.utils.database import upsert_increment
+from app.utils.storage import UPLOAD_ROOT, UPLOAD_STAGING_ROOT, UPLOAD_URL_PREFIX, get_storage
+from app.utils.uploads import StagedUpload
+
+# storage key prefix; locally the blobs live in IMAGE_ROOT
+IMAGE_KEY_PREFIX = "products/"
+IMAGE_ROOT = UPLOAD_ROOT / "products"
+IMAGE_ROOT.mkdir(parents=True, exist_ok=True)
+IMAGE_URL_PREFIX = f"{UPLOAD_URL_PREFIX}{IMAGE_KEY_PREFIX}"
+# resized / re-encoded derivatives, see app/utils/image_variants.py
+VARIANT_ROOT = IMAGE_ROOT / "variants"
+
+# unreferenced blobs younger than this are kept (uploaded, product not saved yet)
+IMAGE_GC_GRACE_SECONDS = int(os.getenv("IMAGE_GC_GRACE_SECONDS", "86400"))
+IMAGE_GC_BATCH_SIZE = 500
+# staged uploads (*.part) this old belong to requests that died mid-upload
+STALE_UPLOAD_SECONDS = int(os.getenv("STALE_UPLOAD_SECONDS", "3600"))
+
+_BLOB_PATH_RE = re.compile(r"/uploads/products/([0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.[A-Za-z0-9]+)(?:[?#].*)?$")
+
+
+def image_extension(content_type: str, filename: Optional[str]) -> str:
+    ext = mimetypes.guess_extension(content_type or "") or os.path.splitext(filename or "")[1]
+    return (ext or ".jpg").lower()
+
+
+def blob_path(sha256: str, ext: str) -> str:
+    """Sharded relative path: ab/cd/abcd....ext"""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def image_hash_from_url(url: Optional[str]) -> Optional[str]:
+    match = _BLOB_PATH_RE.search(url or "")
+    return match.group(2) if match else None
+
+
+def image_public_url(path: str, base_url: str = "") -> str:
+    return get_storage().url(IMAGE_KEY_PREFIX + path, base_url)
+
+
+def register_image_blob(db: Session, sha256: str, path: str, size: int) -> str:
+    """
+    Upsert the blob row (with no references yet) and touch it, so garbage
+    collection leaves a just uploaded blob alone. Returns the stored path, which
+    keeps the first upload's extension for content seen before.
+    """
+    table = ProductImageModel.__table__
+    now = datetime.utcnow()
+    upsert_increment(
+        db,
+        table,
+        {"sha256": sha256},
+        {"ref_count": 0},
+        extra={"path": path, "size": size, "last_seen_at": now},
+    )
+    # a row created by adjust_image_refs before the upload was registered has size 0
+    db.execute(
+        table.update()
+        .where(table.c.sha256 == sha256)
+        .values(last_seen_at=now, size=case((table.c.size == 0, size), else_=table.c.size))
+    )
+    db.commit()
+    return db.execute(select(table.c.path).where(table.c.sha256 == sha256)).scalar_one()
+
+
+def store_image_blob(
+    db: Session, staged: StagedUpload, ext: str, content_type: Optional[str] = None
+) -> Tuple[str, bool]:
+    """
+    Register a staged upload under its content hash and hand it to the storage backend.
+    When the blob already exists the staged copy is dropped and nothing is written.
+    Returns (relative path, created).
+    """
+    try:
+        path = register_image_blob(db, staged.sha256, blob_path(staged.sha256, ext), staged.size)
+        storage = get_storage()
+        if storage.head(IMAGE_KEY_PREFIX + path) is not None:
+            return path, False
+
+        storage.save(staged.path, IMAGE_KEY_PREFIX + path, content_type)
+        return path, True
+    finally:
+        staged.path.unlink(missing_ok=True)
+
+
+def adjust_image_refs(db: Session, url: Optional[str], delta: int) -> None:
+    """
+    Add `delta` product references to the blob behind `url`, in the caller's transaction.
+    A reference to a blob with no row yet (e.g. a direct upload not completed) creates
+    the row, so garbage collection can never treat a referenced image as orphaned.
+    """
+    match = _BLOB_PATH_RE.search(url or "")
+    if not match or not delta:
+        return
+    path, sha256 = match.groups()
+    table = ProductImageModel.__table__
+    if delta > 0:
+        upsert_increment(
+            db,
+            table,
+            {"sha256": sha256},
+            {"ref_count": delta},
+            extra={"path": path, "size": 0, "last_seen_at": datetime.utcnow()},
+        )
+        return
+    db.execute(
+        table.update()
+        .where(table.c.sha256 == sha256)
+        .values(ref_count=table.c.ref_count + delta)
+    )
+
+
+def collect_orphan_images(db: Session, grace_seconds: Optional[int] = None) -> Dict[str, int]:
+    """
+    Delete blobs no product references and that were not uploaded within the grace
+    period, and partial uploads left behind by requests that never finished.
+    """
+    table = ProductImageModel.__table__
+    grace = IMAGE_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    cutoff = datetime.utcnow() - timedelta(seconds=grace)
+    orphaned = (table.c.ref_count <= 0) & (table.c.last_seen_at < cutoff)
+
+    deleted = 0
+    bytes_freed = 0
+    while True:
+        rows = db.execute(
+            select(table.c.sha256, table.c.path, table.c.size)
+            .where(orphaned)
+            .limit(IMAGE_GC_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        for sha256, path, size in rows:
+            # re-check in the DELETE so a blob referenced meanwhile survives
+            result = db.execute(table.delete().where(table.c.sha256 == sha256, orphaned))
+            db.commit()
+            if result.rowcount:
+                get_storage().delete(IMAGE_KEY_PREFIX + path)
+                for variant in (VARIANT_ROOT / sha256[:2] / sha256[2:4]).glob(f"{sha256}_*"):
+                    variant.unlink(missing_ok=True)
+                deleted += 1
+                bytes_freed += size or 0
+
+    stale_uploads = _remove_stale_uploads()
+    return {"deleted": deleted, "bytes_freed": bytes_freed, "stale_uploads": stale_uploads}
+
+
+def _remove_stale_uploads() -> int:
+    cutoff = time.time() - STALE_UPLOAD_SECONDS
+    removed = 0
+    # IMAGE_ROOT: uploads staged there before UPLOAD_STAGING_ROOT existed
+    for directory in (UPLOAD_STAGING_ROOT, IMAGE_ROOT):
+        for path in directory.glob(".*.part"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+    return removed
@@ -0,0 +1,96 @@
+# app/utils/pagination.py
+import base64
+import json
+import os
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Query
+
+from app.utils.cache import TTLCache, get_version
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Opaque keyset cursor for a (created_at, id) position."""
+    raw = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, str]]:
+    """
+    Decode a cursor produced by encode_cursor.
+    Returns None for an empty cursor (first page), raises InvalidCursor when malformed.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+# -----------------------
+# Total counts
+# -----------------------
+
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("COUNT_CACHE_TTL_SECONDS", "60"))
+COUNT_ESTIMATE_THRESHOLD = int(os.getenv("COUNT_ESTIMATE_THRESHOLD", "10000"))
+
+count_cache = TTLCache("list_counts", maxsize=2048, ttl=COUNT_CACHE_TTL_SECONDS)
+
+
+def _normalize_filter(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def count_total(
+    query: Query,
+    table_name: str,
+    filters: Dict[str, Any],
+    estimate: bool = False,
+) -> Tuple[int, bool]:
+    """
+    Total rows for a filtered list query, cached per normalized filter set.
+    The key includes the table version, so any write to `table_name` drops it.
+
+    With estimate=True the count stops at COUNT_ESTIMATE_THRESHOLD rows and
+    returns (threshold, True) as a lower bound instead of counting everything.
+    Returns (total, total_is_estimate).
+    """
+    normalized = tuple(
+        sorted(
+            (key, _normalize_filter(value))
+            for key, value in filters.items()
+            if value is not None and value != ""
+        )
+    )
+    key = (table_name, get_version(table_name), estimate, normalized)
+    cached = count_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if estimate:
+        bounded = query.limit(COUNT_ESTIMATE_THRESHOLD + 1).count()
+        result = (
+            (COUNT_ESTIMATE_THRESHOLD, True)
+            if bounded > COUNT_ESTIMATE_THRESHOLD
+            else (bounded, False)
+        )
+    else:
+        result = (query.count(), False)
+
+    count_cache.set(key, result)
+    return result
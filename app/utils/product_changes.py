@@ -0,0 +1,101 @@
+# app/utils/product_changes.py
+import heapq
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.models import Product as ProductModel, ProductTombstone as ProductTombstoneModel
+from app.utils.catalog import product_entries
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# deletions older than this are forgotten; clients with an older token must resync
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("TOMBSTONE_RETENTION_DAYS", "30"))
+# rows newer than this may still have concurrent commits with an earlier timestamp
+# pending, so the watermark never moves into that window
+CHANGES_SETTLE_SECONDS = float(os.getenv("CHANGES_SETTLE_SECONDS", "2"))
+
+
+class SyncTokenExpired(ValueError):
+    pass
+
+
+def record_tombstone(db: Session, product_id: str) -> None:
+    """Remember a deletion for delta sync, in the caller's transaction."""
+    now = datetime.utcnow()
+    db.add(ProductTombstoneModel(product_id=str(product_id), deleted_at=now))
+    cutoff = now - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+    db.query(ProductTombstoneModel).filter(ProductTombstoneModel.deleted_at < cutoff).delete(
+        synchronize_session=False
+    )
+
+
+def _after(column_ts, column_id, position):
+    ts, last_id = position
+    return or_(column_ts > ts, and_(column_ts == ts, column_id > last_id))
+
+
+def product_changes(db: Session, since: Optional[str], limit: int) -> Dict[str, Any]:
+    """
+    Products created / updated and ids deleted after the `since` token, oldest first,
+    at most `limit` of them. An empty token starts a full sync (no deletions).
+    Both streams are keyset scans: products on (updated_at, id), tombstones on
+    (deleted_at, product_id).
+    """
+    position = decode_cursor(since or "")
+    horizon = datetime.utcnow() - timedelta(seconds=CHANGES_SETTLE_SECONDS)
+
+    if position and position[0] < datetime.utcnow() - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+        raise SyncTokenExpired("Sync token is older than the deletion history, run a full sync")
+
+    products_query = db.query(ProductModel).filter(ProductModel.updated_at <= horizon)
+    if position:
+        products_query = products_query.filter(_after(ProductModel.updated_at, ProductModel.id, position))
+    products = (
+        products_query.order_by(ProductModel.updated_at.asc(), ProductModel.id.asc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    tombstones = []
+    if position:
+        tombstones = (
+            db.query(ProductTombstoneModel)
+            .filter(
+                ProductTombstoneModel.deleted_at <= horizon,
+                _after(ProductTombstoneModel.deleted_at, ProductTombstoneModel.product_id, position),
+            )
+            .order_by(ProductTombstoneModel.deleted_at.asc(), ProductTombstoneModel.product_id.asc())
+            .limit(limit + 1)
+            .all()
+        )
+
+    merged = list(
+        heapq.merge(
+            ((product.updated_at, str(product.id), product) for product in products),
+            ((tombstone.deleted_at, tombstone.product_id, None) for tombstone in tombstones),
+            key=lambda item: (item[0], item[1]),
+        )
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    changed = [row for _, _, row in merged if row is not None]
+    deleted = [row_id for _, row_id, row in merged if row is None]
+    if merged:
+        next_token = encode_cursor(merged[-1][0], merged[-1][1])
+    elif position and position[0] >= horizon:
+        next_token = since
+    else:
+        # nothing changed up to the horizon and nothing can appear before it later:
+        # move the watermark there so idle pollers' tokens never age into expiry
+        next_token = encode_cursor(horizon, "")
+
+    return {
+        "changed": [payload for payload, _ in product_entries(changed)],
+        "deleted": deleted,
+        "next_token": next_token,
+        "has_more": has_more,
+    }
@@ -0,0 +1,72 @@
+# app/utils/product_export.py
+import csv
+import io
+import json
+import os
+from typing import Iterator
+
+from sqlalchemy import select
+
+from app.models import Product as ProductModel
+from app.utils.database import SessionLocal
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "category",
+    "price",
+    "image_url",
+    "created_at",
+    "updated_at",
+)
+
+
+def _export_value(value):
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if not isinstance(value, (str, int, float, bool)):
+        return str(value)  # Decimal prices keep their exact text
+    return value
+
+
+def iter_product_export(fmt: str) -> Iterator[str]:
+    """
+    Yield the whole product table as NDJSON or CSV, one batch of rows per chunk.
+    Uses its own session and a server-side cursor (yield_per), so memory stays
+    flat regardless of catalog size and the request's session can close early.
+    """
+    columns = [getattr(ProductModel, name) for name in EXPORT_COLUMNS]
+    stmt = (
+        select(*columns)
+        .order_by(ProductModel.created_at.asc(), ProductModel.id.asc())
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    db = SessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if fmt == "csv" else None
+        if writer:
+            writer.writerow(EXPORT_COLUMNS)
+
+        for partition in db.execute(stmt).partitions():
+            for row in partition:
+                values = [_export_value(value) for value in row]
+                if writer:
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values)), ensure_ascii=False))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
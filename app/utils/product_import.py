@@ -0,0 +1,130 @@
+# app/utils/product_import.py
+import csv
+import io
+import json
+import os
+import uuid
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import Product as ProductModel
+from app.schemas import ProductCreate
+from app.utils.catalog import add_category_counts, products_imported
+from app.utils.facets import add_price_bucket_counts, price_bucket
+from app.utils.images import adjust_image_refs
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+class ImportAborted(Exception):
+    """An import stopped part way; `report` counts the rows already committed."""
+
+    def __init__(self, message: str, report: Dict[str, Any]):
+        super().__init__(message)
+        self.report = report
+
+
+def _csv_rows(stream: io.TextIOBase) -> Iterator[Tuple[int, Any]]:
+    # row numbers count the header as line 1
+    for line_no, row in enumerate(csv.DictReader(stream), start=2):
+        yield line_no, {key: (value if value != "" else None) for key, value in row.items() if key}
+
+
+def _ndjson_rows(stream: io.TextIOBase) -> Iterator[Tuple[int, Any]]:
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+
+
+def _error_messages(error: Exception) -> List[str]:
+    if isinstance(error, ValidationError):
+        return [
+            f"{'.'.join(str(part) for part in err.get('loc', ())) or 'row'}: {err.get('msg')}"
+            for err in error.errors()
+        ]
+    return [str(error)]
+
+
+def _insert_chunk(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Batched INSERT plus category, price facet and image reference counts, committed as one transaction.
+    executemany compiles the statement once; PyMySQL rewrites it into
+    multi-row INSERTs and sqlite3 loops in C. The category and price bucket
+    counters take one multi-row upsert each.
+    """
+    db.execute(insert(ProductModel.__table__), rows)
+    add_category_counts(db, Counter(row["category"] for row in rows))
+    add_price_bucket_counts(db, Counter((row["category"], price_bucket(row["price"])) for row in rows))
+    for image_url, count in Counter(row["image_url"] for row in rows).items():
+        adjust_image_refs(db, image_url, count)
+    db.commit()
+    products_imported(rows)
+
+
+def import_products(db: Session, upload: BinaryIO, fmt: str) -> Dict[str, Any]:
+    """
+    Stream CSV / NDJSON product rows from `upload`, validate each with ProductCreate
+    and insert valid rows in chunks of IMPORT_CHUNK_SIZE. Invalid rows are skipped
+    and reported; rows in already committed chunks stay imported if a later chunk
+    fails, and the ImportAborted raised then carries the report so far.
+    """
+    stream = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+    rows_iter = _csv_rows(stream) if fmt == "csv" else _ndjson_rows(stream)
+
+    report: Dict[str, Any] = {"total_rows": 0, "imported": 0, "failed": 0, "errors": []}
+    chunk: List[Dict[str, Any]] = []
+    now = datetime.utcnow()
+
+    try:
+        for line_no, raw in rows_iter:
+            report["total_rows"] += 1
+            try:
+                if isinstance(raw, Exception):
+                    raise raw
+                if not isinstance(raw, dict):
+                    raise ValueError("Row must be an object")
+                product = ProductCreate.model_validate(raw)
+            except (ValidationError, ValueError) as e:
+                report["failed"] += 1
+                if len(report["errors"]) < IMPORT_MAX_ERRORS:
+                    report["errors"].append({"row": line_no, "errors": _error_messages(e)})
+                continue
+
+            chunk.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "name": product.name,
+                    "description": product.description,
+                    "category": product.category or None,
+                    "price": Decimal(str(product.price)),
+                    "image_url": product.image_url,
+                    "created_at": now,
+                }
+            )
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                _insert_chunk(db, chunk)
+                report["imported"] += len(chunk)
+                chunk = []
+
+        if chunk:
+            _insert_chunk(db, chunk)
+            report["imported"] += len(chunk)
+    except Exception as e:
+        db.rollback()
+        report["errors_truncated"] = report["failed"] > len(report["errors"])
+        raise ImportAborted(str(e), report) from e
+    finally:
+        stream.detach()
+
+    report["errors_truncated"] = report["failed"] > len(report["errors"])
+    return report
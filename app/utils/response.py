@@ -1,11 +1,14 @@
 # app/utils/response.py
 
+import hashlib
+import json
 from pydantic import BaseModel
 from typing import Any, Optional, Dict
 from uuid import uuid4
-from fastapi.responses import JSONResponse
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.encoders import jsonable_encoder
-from starlette.status import HTTP_200_OK
+from starlette.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
 
 
 # -----------------------
@@ -124,3 +127,34 @@ def validation_error_response(
     }
 
     return JSONResponse(status_code=code, content=jsonable_encoder(payload))
+
+
+# -----------------------
+# Conditional GET
+# -----------------------
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from a content hash of `parts` (anything jsonable)."""
+    raw = json.dumps(jsonable_encoder(parts), sort_keys=True, separators=(",", ":"))
+    return f'"{hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when the request's If-None-Match already names `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore a W/ prefix
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    return response
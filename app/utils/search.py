@@ -0,0 +1,166 @@
+# app/utils/search.py
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Type
+
+from sqlalchemy import column, func, literal_column, or_, table, text
+from sqlalchemy.dialects.mysql import match as mysql_match
+from sqlalchemy.orm import Query
+
+from app.models import Product as ProductModel
+from app.utils.database import engine
+
+logger = logging.getLogger("uvicorn.error")
+
+# empty = pick a backend from the database dialect
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "").strip().lower()
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(term: str) -> List[str]:
+    """Split a free-text search term into lowercase word tokens."""
+    return _TOKEN_RE.findall((term or "").lower())
+
+
+class SearchBackend:
+    """
+    Filters a product query by a free-text term.
+    - apply(): add the match condition (and relevance ordering when rank=True)
+    - is_available(): False when the backing index is missing, so we fall back to LIKE
+    """
+
+    name = "base"
+
+    def is_available(self) -> bool:
+        return True
+
+    def apply(self, query: Query, term: str, rank: bool = True) -> Query:
+        raise NotImplementedError
+
+
+class LikeSearchBackend(SearchBackend):
+    """Substring match without an index. Works everywhere, scans the table."""
+
+    name = "like"
+
+    def apply(self, query: Query, term: str, rank: bool = True) -> Query:
+        search_term = f"%{term}%"
+        return query.filter(
+            or_(
+                ProductModel.name.ilike(search_term),
+                ProductModel.description.ilike(search_term),
+                ProductModel.category.ilike(search_term),
+            )
+        )
+
+
+class SqliteFTSBackend(SearchBackend):
+    """
+    SQLite FTS5 external-content table `products_fts`, kept in sync with
+    `products` by triggers (see migration c4d8e2f1a9b3).
+    """
+
+    name = "sqlite_fts5"
+    # bm25 column weights: name, description, category
+    weights = (10.0, 1.0, 5.0)
+
+    def __init__(self):
+        self._available: Optional[bool] = None
+
+    def is_available(self) -> bool:
+        if self._available is None:
+            with engine.connect() as connection:
+                found = connection.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+                ).first()
+            self._available = found is not None
+            if not self._available:
+                logger.warning("products_fts table not found, product search falls back to LIKE")
+        return self._available
+
+    def apply(self, query: Query, term: str, rank: bool = True) -> Query:
+        tokens = tokenize(term)
+        if not tokens:
+            return _like_backend.apply(query, term, rank)
+
+        # prefix match every token: "mech key" -> "mech"* AND "key"*
+        match = " AND ".join(f'"{token}"*' for token in tokens)
+        fts = table("products_fts", column("rowid"))
+        fts_ref = literal_column("products_fts")
+
+        query = query.join(fts, fts.c.rowid == literal_column("products.rowid")).filter(
+            fts_ref.op("MATCH")(match)
+        )
+        if rank:
+            query = query.order_by(func.bm25(fts_ref, *self.weights))
+        return query
+
+
+class MySQLFullTextBackend(SearchBackend):
+    """MySQL FULLTEXT index `ft_products_search` queried in boolean mode."""
+
+    name = "mysql_fulltext"
+
+    def apply(self, query: Query, term: str, rank: bool = True) -> Query:
+        tokens = tokenize(term)
+        if not tokens:
+            return _like_backend.apply(query, term, rank)
+
+        relevance = mysql_match(
+            ProductModel.name,
+            ProductModel.description,
+            ProductModel.category,
+            against=" ".join(f"+{token}*" for token in tokens),
+        ).in_boolean_mode()
+
+        query = query.filter(relevance)
+        if rank:
+            query = query.order_by(relevance.desc())
+        return query
+
+
+_like_backend = LikeSearchBackend()
+
+_BACKENDS: Dict[str, Type[SearchBackend]] = {
+    LikeSearchBackend.name: LikeSearchBackend,
+    SqliteFTSBackend.name: SqliteFTSBackend,
+    MySQLFullTextBackend.name: MySQLFullTextBackend,
+}
+
+_DIALECT_BACKENDS: Dict[str, str] = {
+    "sqlite": SqliteFTSBackend.name,
+    "mysql": MySQLFullTextBackend.name,
+}
+
+_backend: Optional[SearchBackend] = None
+
+
+def register_backend(backend_cls: Type[SearchBackend], dialect: Optional[str] = None) -> None:
+    """Register a backend by name, optionally as the default for a database dialect."""
+    global _backend
+    _BACKENDS[backend_cls.name] = backend_cls
+    if dialect:
+        _DIALECT_BACKENDS[dialect] = backend_cls.name
+    _backend = None
+
+
+def get_search_backend() -> SearchBackend:
+    global _backend
+    if _backend is None:
+        name = SEARCH_BACKEND or _DIALECT_BACKENDS.get(engine.dialect.name, LikeSearchBackend.name)
+        backend_cls = _BACKENDS.get(name)
+        if backend_cls is None:
+            logger.warning("Unknown SEARCH_BACKEND %r, using LIKE search", name)
+            backend_cls = LikeSearchBackend
+        _backend = backend_cls()
+
+    if not _backend.is_available():
+        return _like_backend
+    return _backend
+
+
+def apply_search(query: Query, term: str, rank: bool = True) -> Query:
+    """Filter a Product query by `term` using the configured search backend."""
+    return get_search_backend().apply(query, term, rank)
@@ -0,0 +1,257 @@
+# app/utils/static.py
+import os
+import re
+import stat
+import threading
+from typing import Dict, Optional, Tuple
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Receive, Scope, Send
+
+from app.utils.catalog_snapshot import MANIFEST_NAME
+from app.utils.image_variants import ensure_variant
+
+VARIANT_PATH_PREFIX = "products/variants/"
+
+STATIC_CHUNK_SIZE = int(os.getenv("STATIC_CHUNK_SIZE", str(256 * 1024)))
+# content-addressed names never change, everything else (legacy uuid uploads) may be replaced
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+UPLOAD_CACHE_MAX_AGE = int(os.getenv("UPLOAD_CACHE_MAX_AGE", "3600"))
+SNAPSHOT_MANIFEST_MAX_AGE = int(os.getenv("SNAPSHOT_MANIFEST_MAX_AGE", "10"))
+
+_HASHED_NAME_RE = re.compile(r"^[0-9a-f]{64}(?:_[a-z]+)?\.[A-Za-z0-9]+$")
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _ServedStats:
+    """Process-wide counters for /uploads traffic."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"responses": 0, "partial": 0, "not_modified": 0, "zero_copy": 0, "bytes_served": 0}
+
+    def record(self, key: str, nbytes: int = 0) -> None:
+        with self._lock:
+            self._counts[key] += 1
+            self._counts["bytes_served"] += nbytes
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+served_stats = _ServedStats()
+
+
+def static_stats() -> Dict[str, int]:
+    return served_stats.snapshot()
+
+
+def cache_control_for(path: str) -> str:
+    if _HASHED_NAME_RE.match(os.path.basename(path)):
+        return IMMUTABLE_CACHE_CONTROL
+    return f"public, max-age={UPLOAD_CACHE_MAX_AGE}"
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Single `bytes=` range -> inclusive (start, end). None means "serve the whole
+    file" (no header, or a multi-range request); raises ValueError when unsatisfiable.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+class UploadFileResponse(FileResponse):
+    """
+    FileResponse that can serve a byte range and hands whole-file bodies to the
+    server (ASGI `http.response.pathsend`, i.e. sendfile) when it supports it.
+    """
+
+    chunk_size = STATIC_CHUNK_SIZE
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.byte_range: Optional[Tuple[int, int]] = None
+
+    def set_range(self, start: int, end: int) -> None:
+        self.byte_range = (start, end)
+        self.status_code = 206
+        self.headers["content-range"] = f"bytes {start}-{end}/{self.stat_result.st_size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            served_stats.record("responses")
+            return
+
+        if self.byte_range is None and "http.response.pathsend" in scope.get("extensions", {}):
+            await send({"type": "http.response.pathsend", "path": os.fspath(self.path)})
+            served_stats.record("zero_copy", self.stat_result.st_size)
+            return
+
+        start, end = self.byte_range or (0, self.stat_result.st_size - 1)
+        remaining = end - start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            if start:
+                await file.seek(start)
+            while True:
+                chunk = await file.read(min(self.chunk_size, remaining)) if remaining > 0 else b""
+                remaining -= len(chunk)
+                more_body = remaining > 0 and len(chunk) > 0
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                if not more_body:
+                    break
+
+        served_stats.record("partial" if self.byte_range else "responses", end - start + 1 - remaining)
+
+
+def is_hidden_path(path: str) -> bool:
+    """Dot-prefixed segments are in-progress writes (*.part, staging dirs), never served."""
+    return any(part.startswith(".") for part in path.replace("\\", "/").split("/") if part)
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    StaticFiles for /uploads: long-lived caching (immutable for content-hashed
+    names), single Range requests, zero-copy where the server allows it, and a
+    missing image variant is rendered on first request.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if is_hidden_path(path):
+            raise HTTPException(status_code=404)
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            if exc.status_code != 404 or not path.startswith(VARIANT_PATH_PREFIX):
+                raise
+            if not await ensure_variant(path[len(VARIANT_PATH_PREFIX):]):
+                raise
+            return await super().get_response(path, scope)
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        response = UploadFileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers={"cache-control": cache_control_for(os.fspath(full_path)), "accept-ranges": "bytes"},
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            served_stats.record("not_modified")
+            return NotModifiedResponse(response.headers)
+
+        if status_code != 200 or not self._range_applies(response.headers, request_headers):
+            return response
+
+        try:
+            byte_range = parse_range(request_headers.get("range"), stat_result.st_size)
+        except ValueError:
+            return Response(
+                status_code=416,
+                headers={"content-range": f"bytes */{stat_result.st_size}"},
+            )
+        if byte_range:
+            response.set_range(*byte_range)
+        return response
+
+    @staticmethod
+    def _range_applies(response_headers: Headers, request_headers: Headers) -> bool:
+        # If-Range: only honour the range while the client's copy is still current
+        if_range = request_headers.get("if-range")
+        if not if_range:
+            return True
+        return if_range in (response_headers["etag"], response_headers["last-modified"])
+
+
+# preferred first; the builder writes <file>.br / <file>.gz next to each JSON file
+_PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class SnapshotStaticFiles(StaticFiles):
+    """
+    Serves catalog snapshots (app/utils/catalog_snapshot.py): the precompressed
+    sibling matching Accept-Encoding when there is one, a short max-age for the
+    manifest and immutable caching for the versioned files it points to.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if is_hidden_path(path):
+            raise HTTPException(status_code=404)
+        request_headers = Headers(scope=scope)
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        if scope["method"] in ("GET", "HEAD"):
+            for encoding, suffix in _PRECOMPRESSED:
+                if encoding not in accepted:
+                    continue
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+                if stat_result and stat.S_ISREG(stat_result.st_mode):
+                    response = FileResponse(
+                        full_path,
+                        stat_result=stat_result,
+                        media_type="application/json",
+                        headers={
+                            "content-encoding": encoding,
+                            "vary": "Accept-Encoding",
+                            "cache-control": self._cache_control(path),
+                        },
+                    )
+                    if self.is_not_modified(response.headers, request_headers):
+                        return NotModifiedResponse(response.headers)
+                    return response
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["cache-control"] = self._cache_control(os.fspath(full_path))
+        response.headers["vary"] = "Accept-Encoding"
+        return response
+
+    @staticmethod
+    def _cache_control(path: str) -> str:
+        if os.path.basename(path) == MANIFEST_NAME:
+            return f"public, max-age={SNAPSHOT_MANIFEST_MAX_AGE}"
+        return IMMUTABLE_CACHE_CONTROL
@@ -0,0 +1,275 @@
+# app/utils/storage.py
+import base64
+import hashlib
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from jose import JWTError, jwt
+
+from app.utils.auth import ALGORITHM, SECRET_KEY
+
+try:
+    import boto3
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # only needed for STORAGE_BACKEND=s3
+    boto3 = None
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+DIRECT_UPLOAD_EXPIRES_SECONDS = int(os.getenv("DIRECT_UPLOAD_EXPIRES_SECONDS", "900"))
+
+UPLOAD_ROOT = Path(__file__).resolve().parents[2] / "uploads"
+UPLOAD_URL_PREFIX = "/uploads/"
+# uploads are written here first: outside the served /uploads tree, but on the same
+# filesystem so the local backend can rename them into place
+UPLOAD_STAGING_ROOT = UPLOAD_ROOT.parent / ".upload-staging"
+# the local backend signs uploads to this API route instead of an object store
+LOCAL_DIRECT_UPLOAD_PATH = "/api/v1/products/direct-upload/"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class StorageError(Exception):
+    pass
+
+
+class InvalidUploadToken(StorageError):
+    pass
+
+
+@dataclass
+class StoredObject:
+    size: int
+    # hex sha256 as verified by the store, None when the backend cannot tell
+    sha256: Optional[str] = None
+
+
+class StorageBackend:
+    """
+    Where uploaded objects live. Keys are relative paths such as
+    "products/ab/cd/<sha256>.png"; URLs are what clients fetch.
+    """
+
+    name = ""
+    # objects are files under UPLOAD_ROOT (served by /uploads, usable for image variants)
+    serves_locally = False
+
+    def save(self, source: Path, key: str, content_type: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    def head(self, key: str) -> Optional[StoredObject]:
+        """Cheap existence / size check (no download); None when the object is missing."""
+        raise NotImplementedError
+
+    def verify_sha256(self, key: str, sha256: str) -> bool:
+        """Whether the stored bytes hash to `sha256`; may read the whole object."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def url(self, key: str, base_url: str = "") -> str:
+        raise NotImplementedError
+
+    def presign_upload(
+        self, key: str, content_type: str, size: int, sha256: str, base_url: str = ""
+    ) -> Dict[str, Any]:
+        """Instructions for a client-side upload: {"method", "url", "headers", "expires_in"}."""
+        raise NotImplementedError
+
+
+class LocalStorageBackend(StorageBackend):
+    name = "local"
+    serves_locally = True
+
+    def __init__(self, root: Path = UPLOAD_ROOT):
+        self.root = root
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    def save(self, source: Path, key: str, content_type: Optional[str] = None) -> None:
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+
+    def head(self, key: str) -> Optional[StoredObject]:
+        try:
+            return StoredObject(size=self.path(key).stat().st_size)
+        except FileNotFoundError:
+            return None
+
+    def verify_sha256(self, key: str, sha256: str) -> bool:
+        hasher = hashlib.sha256()
+        try:
+            with self.path(key).open("rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    hasher.update(chunk)
+        except FileNotFoundError:
+            return False
+        return hasher.hexdigest() == sha256
+
+    def delete(self, key: str) -> None:
+        self.path(key).unlink(missing_ok=True)
+
+    def url(self, key: str, base_url: str = "") -> str:
+        return f"{base_url}{UPLOAD_URL_PREFIX}{key}"
+
+    def presign_upload(
+        self, key: str, content_type: str, size: int, sha256: str, base_url: str = ""
+    ) -> Dict[str, Any]:
+        token = sign_upload_token(key, content_type, size, sha256)
+        return {
+            "method": "PUT",
+            "url": f"{base_url}{LOCAL_DIRECT_UPLOAD_PATH}{token}",
+            "headers": {"Content-Type": content_type},
+            "expires_in": DIRECT_UPLOAD_EXPIRES_SECONDS,
+        }
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    S3-compatible object store (AWS, MinIO, LocalStack...). Set S3_ENDPOINT_URL
+    to point it at a local stand-in. Objects are stored under S3_KEY_PREFIX so the
+    public URLs keep the /uploads/products/... shape image ref counting relies on.
+    """
+
+    name = "s3"
+
+    def __init__(self):
+        if boto3 is None:
+            raise StorageError("STORAGE_BACKEND=s3 requires boto3")
+        self.bucket = os.getenv("S3_BUCKET", "")
+        if not self.bucket:
+            raise StorageError("S3_BUCKET is not set")
+        self.endpoint_url = os.getenv("S3_ENDPOINT_URL") or None
+        self.key_prefix = os.getenv("S3_KEY_PREFIX", "uploads/")
+        self.public_url = (
+            os.getenv("S3_PUBLIC_URL")
+            or (f"{self.endpoint_url}/{self.bucket}" if self.endpoint_url else f"https://{self.bucket}.s3.amazonaws.com")
+        ).rstrip("/")
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=self.endpoint_url,
+            region_name=os.getenv("S3_REGION") or None,
+            # SigV4 signs the checksum header of presigned uploads
+            config=BotoConfig(signature_version="s3v4"),
+        )
+
+    def object_key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def save(self, source: Path, key: str, content_type: Optional[str] = None) -> None:
+        extra = {"CacheControl": IMMUTABLE_CACHE_CONTROL}
+        if content_type:
+            extra["ContentType"] = content_type
+        self.client.upload_file(str(source), self.bucket, self.object_key(key), ExtraArgs=extra)
+
+    def head(self, key: str) -> Optional[StoredObject]:
+        try:
+            meta = self.client.head_object(Bucket=self.bucket, Key=self.object_key(key), ChecksumMode="ENABLED")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        checksum = meta.get("ChecksumSHA256")
+        return StoredObject(
+            size=meta["ContentLength"],
+            sha256=base64.b64decode(checksum).hex() if checksum else None,
+        )
+
+    def verify_sha256(self, key: str, sha256: str) -> bool:
+        stored = self.head(key)
+        if stored is None:
+            return False
+        if stored.sha256 is not None:
+            return stored.sha256 == sha256
+        # stores without additional-checksum support (MinIO, ...): hash the object ourselves
+        return self._hash_object(key) == sha256
+
+    def _hash_object(self, key: str) -> str:
+        hasher = hashlib.sha256()
+        body = self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))["Body"]
+        for chunk in body.iter_chunks(1024 * 1024):
+            hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+
+    def url(self, key: str, base_url: str = "") -> str:
+        return f"{self.public_url}/{self.object_key(key)}"
+
+    def presign_upload(
+        self, key: str, content_type: str, size: int, sha256: str, base_url: str = ""
+    ) -> Dict[str, Any]:
+        # the checksum header is signed, so S3 rejects bytes that do not match the hash
+        checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+        url = self.client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self.object_key(key),
+                "ContentType": content_type,
+                "ContentLength": size,
+                "ChecksumSHA256": checksum,
+                "CacheControl": IMMUTABLE_CACHE_CONTROL,
+            },
+            ExpiresIn=DIRECT_UPLOAD_EXPIRES_SECONDS,
+        )
+        return {
+            "method": "PUT",
+            "url": url,
+            "headers": {
+                "Content-Type": content_type,
+                "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+                "x-amz-checksum-sha256": checksum,
+            },
+            "expires_in": DIRECT_UPLOAD_EXPIRES_SECONDS,
+        }
+
+
+_BACKENDS = {
+    LocalStorageBackend.name: LocalStorageBackend,
+    S3StorageBackend.name: S3StorageBackend,
+}
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        backend = _BACKENDS.get(STORAGE_BACKEND)
+        if backend is None:
+            raise StorageError(f"Unknown STORAGE_BACKEND '{STORAGE_BACKEND}'")
+        _storage = backend()
+    return _storage
+
+
+# -----------------------
+# Direct-upload tokens (local backend)
+# -----------------------
+
+def sign_upload_token(key: str, content_type: str, size: int, sha256: str) -> str:
+    payload = {
+        "purpose": "direct_upload",
+        "key": key,
+        "content_type": content_type,
+        "size": size,
+        "sha256": sha256,
+        "exp": datetime.now(timezone.utc) + timedelta(seconds=DIRECT_UPLOAD_EXPIRES_SECONDS),
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def verify_upload_token(token: str) -> Dict[str, Any]:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError as e:
+        raise InvalidUploadToken("Upload URL is invalid or expired") from e
+    if payload.get("purpose") != "direct_upload":
+        raise InvalidUploadToken("Upload URL is invalid or expired")
+    return payload
@@ -0,0 +1,177 @@
+# app/utils/suggestions.py
+import heapq
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import OrderItem as OrderItemModel, Product as ProductModel
+from app.utils.search import tokenize
+
+# full rebuild interval; picks up writes made by other workers and fresh popularity
+SUGGESTIONS_REBUILD_SECONDS = float(os.getenv("SUGGESTIONS_REBUILD_SECONDS", "600"))
+_MEMO_SIZE = 4096
+
+
+class PrefixIndex:
+    """
+    In-memory autocomplete index over product names.
+    Every word of a name is stored as a (word, product_id) pair in a sorted
+    list, so a prefix lookup is a bisect plus a short scan.
+    Results are ranked by popularity (units sold), then by name.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # one rebuild at a time; the others keep reading the current index
+        self._rebuild_lock = threading.Lock()
+        self._keys: List[Tuple[str, str]] = []
+        self._names: Dict[str, str] = {}
+        self._popularity: Dict[str, int] = {}
+        self._memo: Dict[Tuple[str, int], List[str]] = {}
+        self._loaded_at: Optional[float] = None
+
+    @staticmethod
+    def _keys_for(name: str) -> List[str]:
+        return sorted(set(tokenize(name)))
+
+    def load(self, db: Session) -> None:
+        products = db.query(ProductModel.id, ProductModel.name).all()
+        popularity = dict(
+            db.query(OrderItemModel.product_id, func.sum(OrderItemModel.quantity))
+            .group_by(OrderItemModel.product_id)
+            .all()
+        )
+
+        keys = sorted(
+            (key, str(product_id))
+            for product_id, name in products
+            for key in self._keys_for(name or "")
+        )
+        with self._lock:
+            self._keys = keys
+            self._names = {str(product_id): name for product_id, name in products}
+            self._popularity = {str(k): int(v or 0) for k, v in popularity.items()}
+            self._memo = {}
+            self._loaded_at = time.monotonic()
+
+    def _is_stale(self) -> bool:
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > SUGGESTIONS_REBUILD_SECONDS
+
+    def ensure_loaded(self, db: Session) -> None:
+        """
+        Load on first use, rebuild when older than SUGGESTIONS_REBUILD_SECONDS.
+        Only one caller rebuilds: on a cold start the others wait for it, once an
+        index exists they carry on with the old one.
+        """
+        if not self._is_stale():
+            return
+        cold = self._loaded_at is None
+        if not self._rebuild_lock.acquire(blocking=cold):
+            return
+        try:
+            if self._is_stale():
+                self.load(db)
+        finally:
+            self._rebuild_lock.release()
+
+    def _remove_locked(self, product_id: str) -> None:
+        name = self._names.pop(product_id, None)
+        if name is None:
+            return
+        for key in self._keys_for(name):
+            index = bisect_left(self._keys, (key, product_id))
+            if index < len(self._keys) and self._keys[index] == (key, product_id):
+                del self._keys[index]
+
+    def upsert(self, product_id: str, name: str) -> None:
+        product_id = str(product_id)
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove_locked(product_id)
+            self._names[product_id] = name
+            for key in self._keys_for(name or ""):
+                insort(self._keys, (key, product_id))
+            self._memo = {}
+
+    def upsert_many(self, products: Iterable[Tuple[str, str]]) -> None:
+        """
+        upsert() for a batch of (product_id, name), e.g. an import chunk: the new
+        keys are sorted once and merged into the index in a single pass instead of
+        one O(N) insort per key.
+        """
+        products = [(str(product_id), name) for product_id, name in products]
+        new_keys = sorted(
+            (key, product_id) for product_id, name in products for key in self._keys_for(name or "")
+        )
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            for product_id, _ in products:
+                if product_id in self._names:
+                    self._remove_locked(product_id)
+            for product_id, name in products:
+                self._names[product_id] = name
+            self._keys = list(heapq.merge(self._keys, new_keys))
+            self._memo = {}
+
+    def remove(self, product_id: str) -> None:
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove_locked(str(product_id))
+            self._memo = {}
+
+    def suggest(self, q: str, limit: int = 5) -> List[str]:
+        tokens = tokenize(q)
+        if not tokens:
+            return []
+        memo_key = (" ".join(tokens), limit)
+
+        with self._lock:
+            cached = self._memo.get(memo_key)
+            if cached is not None:
+                return cached
+
+            # scan the range of the longest (most selective) token, then
+            # require every other token to prefix-match a word of the name
+            anchor = max(tokens, key=len)
+            others = [token for token in tokens if token != anchor]
+            candidates = set()
+            index = bisect_left(self._keys, (anchor,))
+            while index < len(self._keys) and self._keys[index][0].startswith(anchor):
+                candidates.add(self._keys[index][1])
+                index += 1
+
+            if others:
+                candidates = {
+                    product_id
+                    for product_id in candidates
+                    if all(
+                        any(word.startswith(token) for word in tokenize(self._names[product_id]))
+                        for token in others
+                    )
+                }
+
+            # best rank per distinct name, then the top `limit` names
+            ranks: Dict[str, Tuple[int, str]] = {}
+            for product_id in candidates:
+                name = self._names[product_id]
+                rank = (-self._popularity.get(product_id, 0), name.lower())
+                if name not in ranks or rank < ranks[name]:
+                    ranks[name] = rank
+            result = heapq.nsmallest(limit, ranks, key=ranks.__getitem__)
+
+            if len(self._memo) >= _MEMO_SIZE:
+                self._memo = {}
+            self._memo[memo_key] = result
+            return result
+
+
+suggestion_index = PrefixIndex()
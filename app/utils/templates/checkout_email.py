@@ -1,4 +1,5 @@
 from app.models.order import Order
+from app.utils.image_variants import variant_urls
 
 
 def build_checkout_email(order: Order) -> str:
@@ -6,10 +7,13 @@ def build_checkout_email(order: Order) -> str:
 
     items_html = ""
     for item in order.items:
+        # JPEG thumbnail: small download and supported by every mail client
+        variants = variant_urls(item.product.image_url) or {}
+        image_src = variants.get("thumb", item.product.image_url)
         items_html += f"""
         <tr>
           <td style="padding:8px; border:1px solid #ddd; display:flex; align-items:center; gap:10px;">
-            <img src="{item.product.image_url}" alt="{item.product.name}" 
+            <img src="{image_src}" alt="{item.product.name}" 
                  style="width:50px; height:50px; object-fit:cover; border-radius:4px; border:1px solid #eee;" />
             <span>{item.product.name}</span>
           </td>
@@ -0,0 +1,71 @@
+# app/utils/uploads.py
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from uuid import uuid4
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_IMAGE_UPLOAD_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class StagedUpload:
+    path: Path
+    sha256: str
+    size: int
+
+
+def _write_chunk(buffer, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    buffer.write(chunk)
+
+
+async def stage_upload(file: UploadFile, directory: Path, max_bytes: Optional[int] = None) -> StagedUpload:
+    """
+    Copy an upload to a temporary file in `directory` chunk by chunk.
+    Disk writes and hashing run in the threadpool so the event loop stays free;
+    the size limit is enforced while streaming. Caller moves or deletes the file.
+    """
+    async def chunks():
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+    return await stage_stream(chunks(), directory, max_bytes)
+
+
+async def stage_stream(chunks: AsyncIterator[bytes], directory: Path, max_bytes: Optional[int] = None) -> StagedUpload:
+    """stage_upload for a raw body stream, e.g. `request.stream()`."""
+    max_bytes = MAX_IMAGE_UPLOAD_BYTES if max_bytes is None else max_bytes
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f".{uuid4().hex}.part"
+    hasher = hashlib.sha256()
+    size = 0
+
+    buffer = await run_in_threadpool(path.open, "wb")
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f"File exceeds the {max_bytes} byte limit")
+            await run_in_threadpool(_write_chunk, buffer, hasher, chunk)
+    except BaseException:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(path.unlink, True)
+        raise
+
+    await run_in_threadpool(buffer.close)
+    return StagedUpload(path=path, sha256=hasher.hexdigest(), size=size)
@@ -1,7 +1,6 @@
 # app/main.py
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.staticfiles import StaticFiles
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
@@ -13,6 +12,9 @@ load_dotenv()
 
 from app.middleware.request_id import RequestIDMiddleware
 from app.utils.database import engine
+from app.utils.cart_sweeper import cart_sweeper
+from app.utils.catalog_snapshot import SNAPSHOT_ROOT, snapshot_builder
+from app.utils.static import SnapshotStaticFiles, UploadStaticFiles
 from app.utils.response import (
     error_response,
     validation_error_response,
@@ -25,7 +27,21 @@ app = FastAPI(title="E-Commerce API")
 
 UPLOAD_ROOT = Path(__file__).resolve().parent / "uploads"
 UPLOAD_ROOT.mkdir(parents=True, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=str(UPLOAD_ROOT)), name="uploads")
+app.mount("/uploads", UploadStaticFiles(directory=str(UPLOAD_ROOT)), name="uploads")
+# precomputed anonymous catalog (CATALOG_SNAPSHOT_ENABLED); nginx / a CDN can serve the same directory
+app.mount("/catalog", SnapshotStaticFiles(directory=str(SNAPSHOT_ROOT)), name="catalog")
+
+
+@app.on_event("startup")
+def build_catalog_snapshot():
+    # first snapshot after boot; later ones follow product writes
+    snapshot_builder.schedule()
+
+
+@app.on_event("startup")
+def start_cart_sweeper():
+    # removes idle guest carts (GUEST_CART_TTL_DAYS) in the background
+    cart_sweeper.start()
 
 # mount API router prefix /api/v1
 from fastapi import APIRouter